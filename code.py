@@ -28,7 +28,8 @@ Setup:
     2. Copy this file as code.py to CIRCUITPY drive
     3. Copy pan_layout.json to CIRCUITPY drive
     4. Copy sounds/ directory with WAV files to CIRCUITPY drive
-       (WAV files: 16-bit signed, mono, 22050 Hz — use install.py to convert)
+       (WAV files: 16-bit signed, mono, 22050 Hz — use install.py to convert;
+       8-bit unsigned with "bits_per_sample": 8 and install.py --bits 8)
     5. If using I2S + ADS1115: install adafruit_ads1x15 and
        adafruit_bus_device libraries to CIRCUITPY/lib/
 
@@ -37,10 +38,57 @@ The sounds/ directory should contain files named like the panipuri project:
     (sharps use lowercase 's': Cs = C#, Fs = F#, etc.)
 """
 
+import array
 import json
+import os
 import time
 import board
 import digitalio
+from micropython import const
+
+# Print every note event and load error. Off by default: print() over USB
+# serial blocks for milliseconds, which shows up as input latency.
+DEBUG = False
+
+try:
+    import audiocore
+    import audiomixer
+except ImportError:
+    # Either missing means no WAV playback; main() falls back to TonePlayer
+    audiocore = None
+    audiomixer = None
+
+# Board-dependent built-ins, imported once here instead of inside the
+# classes that use them. None when the port doesn't provide one.
+try:
+    import audiobusio
+except ImportError:
+    audiobusio = None
+try:
+    import audiopwmio
+except ImportError:
+    audiopwmio = None
+try:
+    import pwmio
+except ImportError:
+    pwmio = None
+try:
+    import analogio
+except ImportError:
+    analogio = None
+try:
+    import touchio
+except ImportError:
+    touchio = None
+try:
+    import rp2pio  # RP2040 / RP2350 only
+except ImportError:
+    rp2pio = None
+
+try:
+    import asyncio  # from the Adafruit bundle (needs adafruit_ticks)
+except ImportError:
+    asyncio = None  # main() falls back to a single polling loop
 
 
 # ---------------------------------------------------------------------------
@@ -180,43 +228,132 @@ NOTE_NAMES_DISPLAY = [
 ]
 
 
+# Velocity (0-127) -> volume level, curve for natural dynamics
+_VEL_LUT = tuple((v / 127.0) ** 0.7 for v in range(128))
+# Same curve as a 50%-max PWM duty cycle, for TonePlayer
+_VEL_DUTY = tuple(int(32768 * level) for level in _VEL_LUT)
+
+
 def note_to_midi(name, octave):
     """Convert note name and octave to MIDI note number."""
     semitone = NOTE_NAMES.get(name)
     if semitone is None:
         return None
-    return (octave + 1) * 12 + semitone
+    midi = (octave + 1) * 12 + semitone
+    if not 0 <= midi < 128:
+        return None
+    return midi
+
+
+# Frequency in Hz for every MIDI note 0-127 (A4 = 440 Hz), built once.
+# The integer version is what PWMOut takes in TonePlayer.
+_MIDI_FREQ = tuple(440.0 * (2.0 ** ((m - 69) / 12.0)) for m in range(128))
+_MIDI_FREQ_INT = tuple(int(f) for f in _MIDI_FREQ)
 
 
 def midi_to_freq(midi_note):
     """Convert MIDI note number to frequency in Hz (A4 = 440 Hz)."""
-    return 440.0 * (2.0 ** ((midi_note - 69) / 12.0))
+    if 0 <= midi_note < 128:
+        return _MIDI_FREQ[midi_note]
+    return None
+
+
+# Filename and display strings for every MIDI note 0-127, built once
+_FILE_NAMES = tuple(
+    "{}{}.wav".format(NOTE_NAMES_FILE[m % 12], m // 12 - 1) for m in range(128))
+_DISPLAY_NAMES = tuple(
+    "{}{}".format(NOTE_NAMES_DISPLAY[m % 12], m // 12 - 1) for m in range(128))
 
 
 def midi_to_filename(midi_note):
     """Convert MIDI note to WAV filename (e.g. 60 -> 'C4.wav', 66 -> 'Fs4.wav')."""
-    octave = (midi_note // 12) - 1
-    note_idx = midi_note % 12
-    return "{}{}.wav".format(NOTE_NAMES_FILE[note_idx], octave)
+    if 0 <= midi_note < 128:
+        return _FILE_NAMES[midi_note]
+    return None
 
 
 def midi_to_display(midi_note):
     """Convert MIDI note to display name (e.g. 60 -> 'C4')."""
-    octave = (midi_note // 12) - 1
-    note_idx = midi_note % 12
-    return "{}{}".format(NOTE_NAMES_DISPLAY[note_idx], octave)
+    if 0 <= midi_note < 128:
+        return _DISPLAY_NAMES[midi_note]
+    return None
 
 
 # ---------------------------------------------------------------------------
 # Layout loader
 # ---------------------------------------------------------------------------
 
+# Note records are tuples; index them with these fields
+_MIDI = const(0)
+_NAME = const(1)
+_OCT = const(2)
+_FREQ = const(3)
+_DISPLAY = const(4)
+_RING = const(5)
+_FILE = const(6)
+_IDX = const(7)
+
+
+def make_note(midi, name, octave, ring="unknown", idx=""):
+    """Build a note record tuple, precomputing freq, display and filename.
+
+    midi must be 0-127 (as note_to_midi guarantees); freq and filename
+    come straight from the MIDI tables.
+    """
+    return (midi, name, octave, _MIDI_FREQ[midi], "{}{}".format(name, octave),
+            ring, _FILE_NAMES[midi], idx)
+
+
+def note_dict(note):
+    """Expand a note record into a dict (for debugging at the REPL)."""
+    return {
+        "midi": note[_MIDI], "name": note[_NAME], "octave": note[_OCT],
+        "freq": note[_FREQ], "display": note[_DISPLAY], "ring": note[_RING],
+        "filename": note[_FILE], "idx": note[_IDX],
+    }
+
+
+def _load_compiled_layout(path):
+    """Load the layout from pan_layout_compiled.py (written by install.py).
+
+    Returns (notes, hardware) like load_layout, or None if the module is
+    missing or was generated from a different pan_layout.json (its
+    SOURCE_CRC is the CRC-32 of the JSON bytes it was built from).
+    """
+    try:
+        import binascii
+        import pan_layout_compiled as compiled
+    except ImportError:
+        return None
+    try:
+        with open(path, "rb") as f:
+            crc = binascii.crc32(f.read())
+        if crc != compiled.SOURCE_CRC:
+            print("pan_layout.json changed, ignoring pan_layout_compiled.py")
+            return None
+    except OSError:
+        pass  # no JSON on the drive: the compiled layout is all we have
+
+    notes = [make_note(midi, name, octave, ring, idx)
+             for midi, name, octave, ring, idx in compiled.NOTES]
+    return notes, compiled.HARDWARE
+
+
 def load_layout(path="pan_layout.json"):
     """Load pan layout from JSON file.
 
-    Returns a list of note dicts sorted by MIDI number, each with:
-        name, octave, ring, idx, midi, freq, filename
+    Uses pan_layout_compiled.py instead when install.py generated one
+    from the same JSON, which skips JSON parsing and sorting at boot.
+
+    Returns a list of note records sorted by MIDI number. Each record is
+    a tuple (midi, name, octave, freq, display, ring, filename, idx),
+    indexed with the _MIDI, _NAME, ... constants; display is name+octave
+    (e.g. "Eb4"), built once for printing/lookup.
     """
+    compiled = _load_compiled_layout(path)
+    if compiled is not None:
+        return compiled
+
     try:
         with open(path, "r") as f:
             data = json.load(f)
@@ -230,12 +367,11 @@ def load_layout(path="pan_layout.json"):
         octave = entry["octave"]
         midi = note_to_midi(name, octave)
         if midi is not None:
-            entry["midi"] = midi
-            entry["freq"] = midi_to_freq(midi)
-            entry["filename"] = midi_to_filename(midi)
-            notes.append(entry)
+            notes.append(make_note(midi, name, octave,
+                                   entry.get("ring", "unknown"),
+                                   entry.get("idx", "")))
 
-    notes.sort(key=lambda n: n["midi"])
+    notes.sort()  # by MIDI number, the first field
 
     hw = data.get("hardware", {})
     return notes, hw
@@ -245,6 +381,9 @@ def load_layout(path="pan_layout.json"):
 # Polyphonic WAV player using audiomixer
 # ---------------------------------------------------------------------------
 
+WAV_BUFFER_SIZE = 1024  # bytes per WaveFile buffer (one per voice, reused)
+
+
 class WavPlayer:
     """Polyphonic WAV sample player using CircuitPython audiomixer.
 
@@ -258,16 +397,21 @@ class WavPlayer:
     """
 
     def __init__(self, audio_out="pwm", audio_pin="GP18", i2s_config=None,
-                 max_voices=8, sample_rate=22050, sounds_dir="sounds"):
-        import audiomixer
+                 max_voices=8, sample_rate=22050, sounds_dir="sounds",
+                 max_cached=12, bits_per_sample=16):
+        if audiocore is None:
+            raise ImportError("no module named 'audiocore' or 'audiomixer'")
 
         self.sounds_dir = sounds_dir
         self.max_voices = max_voices
         self.sample_rate = sample_rate
+        self.max_cached = max_cached
+        self.bits_per_sample = bits_per_sample
 
         # Set up audio output
         if audio_out == "i2s":
-            import audiobusio
+            if audiobusio is None:
+                raise ImportError("no module named 'audiobusio'")
             cfg = i2s_config or {}
             bc_pin = getattr(board, cfg.get("bit_clock", "GP27"), None)
             ws_pin = getattr(board, cfg.get("word_select", "GP28"), None)
@@ -276,7 +420,8 @@ class WavPlayer:
                 raise ValueError("I2S pin(s) not found: {}".format(cfg))
             self.audio = audiobusio.I2SOut(bc_pin, ws_pin, d_pin)
         else:
-            import audiopwmio
+            if audiopwmio is None:
+                raise ImportError("no module named 'audiopwmio'")
             pin = getattr(board, audio_pin, None)
             if pin is None:
                 raise ValueError("Audio pin {} not found".format(audio_pin))
@@ -287,107 +432,219 @@ class WavPlayer:
             voice_count=max_voices,
             sample_rate=sample_rate,
             channel_count=1,
-            bits_per_sample=16,
-            samples_signed=True,
+            bits_per_sample=bits_per_sample,
+            samples_signed=bits_per_sample == 16,  # 8-bit WAV is unsigned
         )
 
         # Start the mixer playing (it runs continuously, voices are added/removed)
         self.audio.play(self.mixer)
+        # Bind the voice objects once so the note path avoids mixer.voice[i]
+        self._voices = list(self.mixer.voice)
 
         # Voice tracking: which MIDI note is on each voice
         self._voice_note = [None] * max_voices
         self._next_voice = 0
-
-        # Cache of loaded WaveFile objects: midi_note -> open file + WaveFile
-        # We keep file handles open so WaveFile can stream from them
-        self._wav_cache = {}
+        # Inverse of _voice_note: midi_note -> voice index (O(1) lookup)
+        self._note_to_voice = {}
+        # Bit i set = voice i was started and not stopped since
+        self._active_mask = 0
+        self._bit_index = {1 << i: i for i in range(max_voices)}
+        # note_on_batch: voices claimed but not yet started (kept out of the
+        # idle refresh in _alloc_voice) and the reused claim list
+        self._claimed_mask = 0
+        self._batch = []
+
+        # Open WAV file handles: midi_note -> file. Kept open so note_on
+        # only needs a seek before a WaveFile streams from them.
         self._file_cache = {}
+        # One WaveFile buffer per voice: a voice plays one WAV at a time, so
+        # buffer memory is max_voices * WAV_BUFFER_SIZE however many notes
+        self._wav_buffers = [bytearray(WAV_BUFFER_SIZE) for _ in range(max_voices)]
+        # Last WaveFile built on each voice and its note: replaying the same
+        # note on that voice reuses it (play() rewinds) instead of reparsing
+        self._voice_wave = [None] * max_voices
+        self._voice_wave_note = [None] * max_voices
+
+        # Lazy loading: midi_note -> full path for every WAV found on disk.
+        # Files are opened on first note_on; at most max_cached stay open,
+        # least recently played first out (_lru is oldest -> newest).
+        self._paths = {}
+        self._lru = []
 
     def load_note(self, midi_note, filename):
-        """Pre-load a WAV file for a note. Returns True if successful."""
-        import audiocore
+        """Open a WAV file for a note. Returns True if successful."""
+        return self._open_note(midi_note, self.sounds_dir + "/" + filename)
 
-        path = "{}/{}".format(self.sounds_dir, filename)
+    def _open_note(self, midi_note, path):
         try:
-            f = open(path, "rb")
-            wav = audiocore.WaveFile(f)
-            self._wav_cache[midi_note] = wav
-            self._file_cache[midi_note] = f
+            self._file_cache[midi_note] = open(path, "rb")
             return True
         except OSError:
             return False
-        except Exception as e:
-            print("  Load error {}: {}".format(filename, e))
-            return False
+
+    def unload_note(self, midi_note):
+        """Close a loaded WAV file."""
+        f = self._file_cache.pop(midi_note, None)
+        if f is not None:
+            f.close()
+            for i in range(self.max_voices):
+                if self._voice_wave_note[i] == midi_note:
+                    self._voice_wave[i] = None
+                    self._voice_wave_note[i] = None
 
     def load_all(self, notes):
-        """Load WAV files for all notes in the layout."""
+        """Register WAV files for all notes in the layout.
+
+        Only checks that each file exists (one directory listing, no
+        per-file stat); files are opened lazily on the first note_on so
+        startup doesn't hold every WaveFile in RAM.
+        """
+        try:
+            on_disk = set(os.listdir(self.sounds_dir))
+        except OSError:
+            on_disk = set()
+        prefix = self.sounds_dir + "/"
         loaded = 0
         missing = 0
         for note in notes:
-            if self.load_note(note["midi"], note["filename"]):
+            if note[_FILE] in on_disk:
+                self._paths[note[_MIDI]] = prefix + note[_FILE]
                 loaded += 1
             else:
                 missing += 1
-                print("  Missing: {}".format(note["filename"]))
+                print("  Missing: {}".format(note[_FILE]))
 
-        print("Loaded {}/{} WAV samples".format(loaded, loaded + missing))
+        print("Found {}/{} WAV samples".format(loaded, loaded + missing))
         return loaded
 
+    def _touch_cached(self, midi_note):
+        """Mark a note most recently used; close the oldest idle extras."""
+        lru = self._lru
+        if midi_note in lru:
+            lru.remove(midi_note)
+        lru.append(midi_note)
+
+        i = 0
+        while len(self._file_cache) > self.max_cached and i < len(lru):
+            old = lru[i]
+            if old in self._note_to_voice:
+                i += 1  # may still be sounding, keep it
+                continue
+            lru.pop(i)
+            self.unload_note(old)
+
     def _alloc_voice(self):
-        """Allocate a mixer voice using round-robin."""
+        """Allocate a mixer voice, preferring idle ones.
+
+        Takes the lowest voice not marked active. If all are marked, voices
+        whose sample has finished (not .playing) are cleared first; only
+        when every voice is still sounding is one stolen round-robin.
+        """
+        full = (1 << self.max_voices) - 1
+        free = ~self._active_mask & full
+        if not free:
+            for i, voice in enumerate(self._voices):
+                if not voice.playing and not self._claimed_mask & (1 << i):
+                    self._active_mask &= ~(1 << i)
+            free = ~self._active_mask & full
+        if free:
+            return self._bit_index[free & -free]  # lowest idle voice
+
         voice = self._next_voice
         self._next_voice = (self._next_voice + 1) % self.max_voices
         return voice
 
-    def _find_voice(self, midi_note):
-        """Find which voice is playing a given note, or None."""
-        for i, note in enumerate(self._voice_note):
-            if note == midi_note:
-                return i
-        return None
+    def _release_voice(self, voice_idx):
+        """Clear the note bookkeeping for a voice (does not stop it)."""
+        self._active_mask &= ~(1 << voice_idx)
+        old = self._voice_note[voice_idx]
+        if old is not None:
+            self._note_to_voice.pop(old, None)
+            self._voice_note[voice_idx] = None
 
-    def note_on(self, midi_note, velocity=100):
-        """Start playing a note. Allocates a mixer voice and plays the WAV.
+    def _claim_voice(self, midi_note):
+        """Choose and stop a voice for a note, and bind it to the note.
 
-        If the note is already playing, restarts it.
-        If all voices are in use, steals the oldest (round-robin).
+        A sounding note is restarted on its own voice; otherwise idle
+        voices are used first, and one is stolen round-robin only if all
+        are sounding. Returns the voice index, or None if the note has no
+        WAV file.
         """
-        wav = self._wav_cache.get(midi_note)
-        if wav is None:
-            return
+        if midi_note not in self._file_cache:
+            path = self._paths.get(midi_note)
+            if path is None or not self._open_note(midi_note, path):
+                return None
+
+        voice_idx = self._note_to_voice.get(midi_note)
+        if voice_idx is None:
+            voice_idx = self._alloc_voice()
+        voice = self._voices[voice_idx]
+
+        # Stop whatever was on this voice (idle voices need no C call)
+        if voice.playing:
+            voice.stop()
+        self._release_voice(voice_idx)
+        self._voice_note[voice_idx] = midi_note
+        self._note_to_voice[midi_note] = voice_idx
+        self._active_mask |= 1 << voice_idx
+        return voice_idx
 
-        # If this note is already playing, stop it first
-        existing = self._find_voice(midi_note)
-        if existing is not None:
-            self.mixer.voice[existing].stop()
-            self._voice_note[existing] = None
+    def _start_voice(self, voice_idx, midi_note, velocity):
+        """Play a claimed voice's note at the given velocity."""
+        voice = self._voices[voice_idx]
 
-        # Allocate a voice
-        voice_idx = self._alloc_voice()
+        # Set volume based on velocity (curve for natural dynamics)
+        voice.level = _VEL_LUT[velocity if 0 <= velocity < 128 else 100]
 
-        # Stop whatever was on this voice
-        self.mixer.voice[voice_idx].stop()
+        # Reuse this voice's WaveFile if it already holds the note;
+        # otherwise rewind the file and wrap it in the voice's own buffer
+        try:
+            wave = self._voice_wave[voice_idx]
+            if self._voice_wave_note[voice_idx] != midi_note:
+                f = self._file_cache[midi_note]
+                f.seek(0)
+                wave = audiocore.WaveFile(f, self._wav_buffers[voice_idx])
+                self._voice_wave[voice_idx] = wave
+                self._voice_wave_note[voice_idx] = midi_note
+            voice.play(wave)
+        except Exception as e:
+            if DEBUG:
+                print("  Play error {}: {}".format(midi_to_filename(midi_note), e))
+            self._release_voice(voice_idx)
+            return
+        self._touch_cached(midi_note)
 
-        # Set volume based on velocity (curve for natural dynamics)
-        vol = (velocity / 127.0) ** 0.7
-        self.mixer.voice[voice_idx].level = vol
-
-        # Rewind the WAV to the start and play
-        # We need to re-open the file since WaveFile doesn't support seeking
-        # after playback in CircuitPython
-        import audiocore
-        midi = midi_note
-        if midi in self._file_cache:
-            try:
-                self._file_cache[midi].seek(0)
-                wav = audiocore.WaveFile(self._file_cache[midi])
-                self._wav_cache[midi] = wav
-            except Exception:
-                return
+    def note_on(self, midi_note, velocity=100):
+        """Start playing a note. Allocates a mixer voice and plays the WAV.
 
-        self.mixer.voice[voice_idx].play(wav)
-        self._voice_note[voice_idx] = midi_note
+        If the note is already playing, restarts it on the same voice.
+        Otherwise idle voices are used first; if all are sounding, steals
+        one round-robin.
+        """
+        voice_idx = self._claim_voice(midi_note)
+        if voice_idx is not None:
+            self._start_voice(voice_idx, midi_note, velocity)
+
+    def note_on_batch(self, events):
+        """Start every note pressed in one scan, e.g. a struck chord.
+
+        events holds (note, velocity) pairs as returned by scan(). Voices
+        for all notes are claimed (and stopped) before any is started, so
+        the notes of a chord begin back to back.
+        """
+        claimed = self._batch
+        claimed.clear()
+        for note, velocity in events:
+            midi_note = note[_MIDI]
+            voice_idx = self._claim_voice(midi_note)
+            if voice_idx is not None:
+                claimed.append((voice_idx, midi_note, velocity))
+                self._claimed_mask |= 1 << voice_idx
+        for voice_idx, midi_note, velocity in claimed:
+            # Skip claims taken over by a later note (chord > max_voices)
+            if self._voice_note[voice_idx] == midi_note:
+                self._start_voice(voice_idx, midi_note, velocity)
+        self._claimed_mask = 0
 
     def note_off(self, midi_note):
         """Stop a specific note (with fadeout-like behavior).
@@ -395,28 +652,31 @@ class WavPlayer:
         Steel pan notes naturally decay, so this is optional.
         Call this to cut a note short.
         """
-        voice_idx = self._find_voice(midi_note)
+        voice_idx = self._note_to_voice.get(midi_note)
         if voice_idx is not None:
             # Fade out by reducing level (instant stop sounds harsh)
-            self.mixer.voice[voice_idx].level = 0.0
-            self.mixer.voice[voice_idx].stop()
-            self._voice_note[voice_idx] = None
+            voice = self._voices[voice_idx]
+            voice.level = 0.0
+            voice.stop()
+            self._release_voice(voice_idx)
 
     def all_off(self):
         """Stop all voices."""
-        for i in range(self.max_voices):
-            self.mixer.voice[i].stop()
+        for i, voice in enumerate(self._voices):
+            if voice.playing:
+                voice.stop()
             self._voice_note[i] = None
+        self._note_to_voice.clear()
+        self._active_mask = 0
 
     def deinit(self):
         """Clean up audio resources."""
         self.all_off()
         self.audio.stop()
         self.audio.deinit()
-        for f in self._file_cache.values():
-            f.close()
-        self._file_cache.clear()
-        self._wav_cache.clear()
+        for midi_note in list(self._file_cache):
+            self.unload_note(midi_note)
+        self._lru.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -430,32 +690,38 @@ class TonePlayer:
     """
 
     def __init__(self, pin_name="GP18"):
-        import pwmio
-        self.pwmio = pwmio
         self.pin_name = pin_name
         self.pin = getattr(board, pin_name, None)
         self.pwm = None
-
-    def note_on(self, midi_note, velocity=100):
-        freq = int(midi_to_freq(midi_note))
-        if self.pin is None or freq < 20 or freq > 20000:
+        if self.pin is None or pwmio is None:
             return
-        self.note_off(midi_note)
         try:
-            duty = int(32768 * (velocity / 127.0) ** 0.7)
-            self.pwm = self.pwmio.PWMOut(
-                self.pin, frequency=freq, duty_cycle=duty, variable_frequency=True
+            # One PWMOut for the player's lifetime; notes only retune it
+            self.pwm = pwmio.PWMOut(
+                self.pin, frequency=440, duty_cycle=0, variable_frequency=True
             )
         except Exception as e:
             print("Tone error: {}".format(e))
 
+    def note_on(self, midi_note, velocity=100):
+        freq = _MIDI_FREQ_INT[midi_note]
+        if self.pwm is None or freq < 20 or freq > 20000:
+            return
+        try:
+            self.pwm.frequency = freq
+            self.pwm.duty_cycle = _VEL_DUTY[velocity if 0 <= velocity < 128 else 100]
+        except Exception as e:
+            if DEBUG:
+                print("Tone error: {}".format(e))
+
+    def note_on_batch(self, events):
+        # Monophonic: the last note of a chord wins
+        for note, velocity in events:
+            self.note_on(note[_MIDI], velocity)
+
     def note_off(self, midi_note):
         if self.pwm is not None:
-            try:
-                self.pwm.deinit()
-            except Exception:
-                pass
-            self.pwm = None
+            self.pwm.duty_cycle = 0
 
     def all_off(self):
         self.note_off(0)
@@ -465,7 +731,9 @@ class TonePlayer:
         return 0
 
     def deinit(self):
-        self.all_off()
+        if self.pwm is not None:
+            self.pwm.deinit()
+            self.pwm = None
 
 
 # ---------------------------------------------------------------------------
@@ -551,30 +819,52 @@ def _create_i2c_adc_channels(adc_config, count=2):
 # ---------------------------------------------------------------------------
 
 def build_note_lookup(notes):
-    """Build lookup dicts for finding notes by name+octave, idx, or MIDI."""
-    by_name = {}
-    by_idx = {}
-    by_midi = {}
+    """Build one lookup dict keyed by name+octave, idx, and MIDI string.
+
+    An idx can equal a note name (central-ring "C4" vs note C4), so keys
+    are filled in reverse priority: name+octave wins over idx, idx over MIDI.
+    """
+    lookup = {}
+    for n in notes:
+        lookup[str(n[_MIDI])] = n
     for n in notes:
-        key = "{}{}".format(n["name"], n["octave"])
-        by_name[key] = n
-        by_idx[n.get("idx", "")] = n
-        by_midi[str(n["midi"])] = n
-    return by_name, by_idx, by_midi
+        idx = n[_IDX]
+        if idx:
+            lookup[idx] = n
+    for n in notes:
+        lookup[n[_DISPLAY]] = n
+    return lookup
 
 
-def find_note(note_id, by_name, by_idx, by_midi):
+def find_note(note_id, lookup):
     """Find a note by name+octave, idx, or MIDI number string."""
-    note_id = str(note_id)
-    return by_name.get(note_id) or by_idx.get(note_id) or by_midi.get(note_id)
+    return lookup.get(str(note_id))
+
+
+# Eager debounce: a press fires on the first active reading, then the pad
+# is locked out (no re-trigger, no release) until the contacts stop bouncing.
+DEBOUNCE_NS = const(5_000_000)  # 5 ms
+
+# CD74HC4067 switching settles well within this at 3.3 V
+MUX_SETTLE_NS = const(50_000)  # 50 us
+
+# Top 6 bits of a 16-bit ADC reading -> velocity 1-127 (no float math)
+_RAW_TO_VEL = tuple(i * 126 // 63 + 1 for i in range(64))
 
 
 class ButtonInput:
     """Reads GPIO pins as buttons (active low, internal pull-up)."""
 
     def __init__(self, pin_map, notes):
-        self.buttons = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        # Result lists returned by scan(), cleared and refilled each call
+        self._pressed = []
+        self._released = []
+        # Parallel per-button lists (one index per button)
+        self._pins = []
+        self._notes = []
+        self._was = bytearray()  # 1 byte per pad: last state 0/1
+        self._lockout = []
+        lookup = build_note_lookup(notes)
 
         for pin_name, note_id in pin_map.items():
             bp = getattr(board, pin_name, None)
@@ -582,7 +872,7 @@ class ButtonInput:
                 print("WARNING: Pin {} not found".format(pin_name))
                 continue
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -591,42 +881,63 @@ class ButtonInput:
                 dio = digitalio.DigitalInOut(bp)
                 dio.direction = digitalio.Direction.INPUT
                 dio.pull = digitalio.Pull.UP
-                self.buttons.append({
-                    "pin": dio,
-                    "note": note_info,
-                    "was_pressed": False,
-                })
+                self._pins.append(dio)
+                self._notes.append(note_info)
+                self._was.append(0)
+                self._lockout.append(0)
             except Exception as e:
                 print("WARNING: {} init failed: {}".format(pin_name, e))
 
     def scan(self):
-        """Returns (pressed_notes, released_notes) lists."""
-        pressed = []
-        released = []
-        for btn in self.buttons:
-            is_pressed = not btn["pin"].value
-            if is_pressed and not btn["was_pressed"]:
-                pressed.append(btn["note"])
-            elif not is_pressed and btn["was_pressed"]:
-                released.append(btn["note"])
-            btn["was_pressed"] = is_pressed
+        """Returns (pressed, released) lists.
+
+        pressed holds (note, velocity) tuples (fixed velocity 100),
+        released holds note records.
+
+        Eager debounce: a press is reported on the first low reading, then
+        the button is ignored for DEBOUNCE_NS before a release can register.
+        Both lists are reused: consume them before the next scan().
+        """
+        pressed = self._pressed
+        released = self._released
+        pressed.clear()
+        released.clear()
+        now = time.monotonic_ns()
+        pins = self._pins
+        was = self._was
+        lockout = self._lockout
+        for i in range(len(pins)):
+            if now < lockout[i]:
+                continue
+            is_pressed = not pins[i].value
+            if is_pressed and not was[i]:
+                pressed.append((self._notes[i], 100))
+                lockout[i] = now + DEBOUNCE_NS
+            elif not is_pressed and was[i]:
+                released.append(self._notes[i])
+                lockout[i] = now + DEBOUNCE_NS
+            was[i] = is_pressed
         return pressed, released
 
     @property
     def count(self):
-        return len(self.buttons)
+        return len(self._pins)
 
 
 class TouchInput:
     """Reads GPIO pins as capacitive touch inputs."""
 
     def __init__(self, pin_map, notes):
-        self.pads = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
-
-        try:
-            import touchio
-        except ImportError:
+        # Result lists returned by scan(), cleared and refilled each call
+        self._pressed = []
+        self._released = []
+        # Parallel per-pad lists (one index per pad)
+        self._pads = []
+        self._notes = []
+        self._was = bytearray()  # 1 byte per pad: last state 0/1
+        lookup = build_note_lookup(notes)
+
+        if touchio is None:
             print("WARNING: touchio unavailable")
             return
 
@@ -636,37 +947,44 @@ class TouchInput:
                 print("WARNING: Pin {} not found".format(pin_name))
                 continue
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
 
             try:
                 tp = touchio.TouchIn(bp)
-                self.pads.append({
-                    "pad": tp,
-                    "note": note_info,
-                    "was_touched": False,
-                })
+                self._pads.append(tp)
+                self._notes.append(note_info)
+                self._was.append(0)
             except Exception as e:
                 print("WARNING: Touch {} failed: {}".format(pin_name, e))
 
     def scan(self):
-        """Returns (pressed_notes, released_notes) lists."""
-        pressed = []
-        released = []
-        for pad in self.pads:
-            is_touched = pad["pad"].value
-            if is_touched and not pad["was_touched"]:
-                pressed.append(pad["note"])
-            elif not is_touched and pad["was_touched"]:
-                released.append(pad["note"])
-            pad["was_touched"] = is_touched
+        """Returns (pressed, released) lists.
+
+        pressed holds (note, velocity) tuples (fixed velocity 100),
+        released holds note records.
+        Both lists are reused: consume them before the next scan().
+        """
+        pressed = self._pressed
+        released = self._released
+        pressed.clear()
+        released.clear()
+        pads = self._pads
+        was = self._was
+        for i in range(len(pads)):
+            is_touched = pads[i].value
+            if is_touched and not was[i]:
+                pressed.append((self._notes[i], 100))
+            elif not is_touched and was[i]:
+                released.append(self._notes[i])
+            was[i] = is_touched
         return pressed, released
 
     @property
     def count(self):
-        return len(self.pads)
+        return len(self._pads)
 
 
 class MuxTouchInput:
@@ -694,8 +1012,16 @@ class MuxTouchInput:
     """
 
     def __init__(self, pin_map, notes, mux_config, adc_config=None):
-        self.pads = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        # Result lists returned by scan(), cleared and refilled each call
+        self._pressed = []
+        self._released = []
+        # Parallel per-pad lists (one index per pad)
+        self._pins = []
+        self._notes = []
+        self._mux_ch = []
+        self._was = bytearray()  # 1 byte per pad: last state 0/1
+        self._lockout = []
+        lookup = build_note_lookup(notes)
 
         # Set up ADC — external I2C (ADS1115) or native (analogio)
         adc_type = adc_config.get("type", "native") if adc_config else "native"
@@ -704,7 +1030,8 @@ class MuxTouchInput:
             if self.adc:
                 print("Mux ADC: ADS1115 channel A0 via I2C")
         else:
-            import analogio
+            if analogio is None:
+                raise ImportError("no module named 'analogio'")
             adc_pin_name = mux_config.get("analog_pin", "GP26")
             adc_pin = getattr(board, adc_pin_name, None)
             if adc_pin is None:
@@ -726,6 +1053,10 @@ class MuxTouchInput:
             self.select_pins.append(dio)
 
         self.num_select = len(self.select_pins)
+        # Per-channel select pin levels, so addressing is plain stores
+        self._chan_bits = tuple(
+            tuple(bool(c & (1 << i)) for i in range(self.num_select))
+            for c in range(1 << self.num_select))
         print("Mux: {} select pins".format(self.num_select))
 
         # Set up per-pad digital trigger + mux channel
@@ -743,7 +1074,7 @@ class MuxTouchInput:
                 print("WARNING: Pin {} not found".format(pin_name))
                 continue
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -752,60 +1083,123 @@ class MuxTouchInput:
                 dio = digitalio.DigitalInOut(bp)
                 dio.direction = digitalio.Direction.INPUT
                 dio.pull = digitalio.Pull.UP
-                self.pads.append({
-                    "pin": dio,
-                    "note": note_info,
-                    "mux_channel": mux_ch,
-                    "was_pressed": False,
-                })
+                self._pins.append(dio)
+                self._notes.append(note_info)
+                self._mux_ch.append(mux_ch)
+                self._was.append(0)
+                self._lockout.append(0)
             except Exception as e:
                 print("WARNING: {} init failed: {}".format(pin_name, e))
 
+        # Order pads by mux channel so presses in one scan address the
+        # mux in ascending order (and repeats of a channel skip the settle)
+        order = sorted(range(len(self._pins)), key=lambda i: (
+            self._mux_ch[i] if self._mux_ch[i] is not None else -1))
+        self._pins = [self._pins[i] for i in order]
+        self._notes = [self._notes[i] for i in order]
+        self._mux_ch = [self._mux_ch[i] for i in order]
+        self._last_mux_channel = None
+
     def _set_mux_channel(self, channel):
         """Set mux select pins to address a channel (binary encoding)."""
-        for i in range(self.num_select):
-            self.select_pins[i].value = bool(channel & (1 << i))
+        bits = self._chan_bits[channel]
+        sp = self.select_pins
+        if self.num_select == 4:  # CD74HC4067: unrolled
+            sp[0].value = bits[0]
+            sp[1].value = bits[1]
+            sp[2].value = bits[2]
+            sp[3].value = bits[3]
+        else:
+            for i in range(self.num_select):
+                sp[i].value = bits[i]
 
     def _read_velocity(self, channel):
         """Read analog value from a mux channel and map to velocity 1-127."""
         if channel is None or self.num_select == 0:
             return 100  # default velocity if no mux channel assigned
 
-        self._set_mux_channel(channel)
-        # Small settle time for mux switching
-        time.sleep(0.001)
+        if channel != self._last_mux_channel:
+            self._set_mux_channel(channel)
+            self._last_mux_channel = channel
+            # Busy-wait for the mux to settle (time.sleep can't do < 1 ms)
+            t0 = time.monotonic_ns()
+            while time.monotonic_ns() - t0 < MUX_SETTLE_NS:
+                pass
         raw = self.adc.value  # 0-65535 (16-bit, 0-3.3V)
 
-        # Linear map: 0V -> velocity 1, 3.3V -> velocity 127
-        velocity = int((raw / 65535.0) * 126) + 1
-        return max(1, min(127, velocity))
+        # Linear map on the top 6 bits: 0V -> velocity 1, 3.3V -> 127
+        return _RAW_TO_VEL[raw >> 10]
 
     def scan(self):
         """Scan digital pins; read analog velocity for new presses.
 
-        Returns (pressed_notes, released_notes). Each pressed note dict
-        has a "velocity" key set from the analog reading.
+        Returns (pressed, released). pressed holds (note, velocity)
+        tuples with velocity from the analog reading; the shared note
+        records are never copied. Uses the same eager debounce as ButtonInput.
+        Both lists are reused: consume them before the next scan().
         """
-        pressed = []
-        released = []
-
-        for pad in self.pads:
-            is_pressed = not pad["pin"].value  # active low
-            if is_pressed and not pad["was_pressed"]:
-                vel = self._read_velocity(pad["mux_channel"])
-                # Attach velocity to a copy so we don't mutate the note dict
-                note_with_vel = dict(pad["note"])
-                note_with_vel["velocity"] = vel
-                pressed.append(note_with_vel)
-            elif not is_pressed and pad["was_pressed"]:
-                released.append(pad["note"])
-            pad["was_pressed"] = is_pressed
+        pressed = self._pressed
+        released = self._released
+        pressed.clear()
+        released.clear()
+        now = time.monotonic_ns()
+        pins = self._pins
+        was = self._was
+        lockout = self._lockout
+
+        for i in range(len(pins)):
+            if now < lockout[i]:
+                continue
+            is_pressed = not pins[i].value  # active low
+            if is_pressed and not was[i]:
+                vel = self._read_velocity(self._mux_ch[i])
+                pressed.append((self._notes[i], vel))
+                lockout[i] = now + DEBOUNCE_NS
+            elif not is_pressed and was[i]:
+                released.append(self._notes[i])
+                lockout[i] = now + DEBOUNCE_NS
+            was[i] = is_pressed
 
         return pressed, released
 
     @property
     def count(self):
-        return len(self.pads)
+        return len(self._pins)
+
+
+# PIO program "out pins, 4" (hand-assembled, so adafruit_pioasm isn't
+# needed): each FIFO word's low 4 bits go straight onto the select pins.
+_PIO_OUT_PINS_4 = array.array("H", (0x6004,))
+
+
+def _mux_select_sm(pin_names):
+    """Create a PIO state machine driving 4 consecutive mux select pins.
+
+    Returns None when rp2pio is unavailable or the pins are not
+    GPn..GPn+3, in which case the caller falls back to digitalio.
+    """
+    if rp2pio is None or len(pin_names) != 4:
+        return None
+    if not all(name.startswith("GP") and name[2:].isdigit() for name in pin_names):
+        return None
+    first = int(pin_names[0][2:])
+    if [int(name[2:]) for name in pin_names] != list(range(first, first + 4)):
+        return None
+    first_pin = getattr(board, pin_names[0], None)
+    if first_pin is None:
+        return None
+    try:
+        return rp2pio.StateMachine(
+            _PIO_OUT_PINS_4,
+            frequency=1_000_000,
+            first_out_pin=first_pin,
+            out_pin_count=4,
+            auto_pull=True,
+            pull_threshold=4,
+        )
+    except Exception as e:
+        print("WARNING: PIO mux select unavailable: {}".format(e))
+        return None
 
 
 class MuxScanInput:
@@ -823,6 +1217,10 @@ class MuxScanInput:
     This mode supports up to 32 pads (16 per mux) using only 8 Pico
     GPIO pins total (+ I2C for ADC), ideal for a full 29-note tenor pan.
 
+    Scanning runs on the main core: CircuitPython has no _thread, and
+    audiomixer output is DMA-driven, so the scan only competes with the
+    buffer refills CircuitPython runs between bytecodes.
+
     Config in pan_layout.json:
         "hardware": {
             "input_mode": "mux_scan",
@@ -842,25 +1240,39 @@ class MuxScanInput:
     """
 
     def __init__(self, notes, mux_config, pads_config, adc_config=None):
-        self.pads = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        # Result lists returned by scan(), cleared and refilled each call
+        self._pressed = []
+        self._released = []
+        # Parallel per-pad lists (one index per pad)
+        self._notes = []
+        self._mux = []
+        self._channel = bytearray()
+        self._was = bytearray()  # 1 byte per pad: last state 0/1
+        lookup = build_note_lookup(notes)
 
         # Threshold for touch detection (0-65535, ~3000 ≈ 0.15V)
         self.threshold = mux_config.get("threshold", 3000)
         # Settle time in microseconds after switching mux channel
         self.settle_us = mux_config.get("settle_us", 100)
+        self._build_velocity_table()
+        self._settle_ns = self.settle_us * 1000
 
-        # Set up shared mux select pins
+        # Set up shared mux select pins: a PIO state machine when the
+        # board allows it, otherwise one DigitalInOut per pin
+        select_names = mux_config.get("select_pins", [])
         self.select_pins = []
-        for sp_name in mux_config.get("select_pins", []):
-            sp = getattr(board, sp_name, None)
-            if sp is None:
-                print("WARNING: Select pin {} not found".format(sp_name))
-                continue
-            dio = digitalio.DigitalInOut(sp)
-            dio.direction = digitalio.Direction.OUTPUT
-            dio.value = False
-            self.select_pins.append(dio)
+        self._ch_sm = _mux_select_sm(select_names)
+        self._ch_buf = bytearray(1)
+        if self._ch_sm is None:
+            for sp_name in select_names:
+                sp = getattr(board, sp_name, None)
+                if sp is None:
+                    print("WARNING: Select pin {} not found".format(sp_name))
+                    continue
+                dio = digitalio.DigitalInOut(sp)
+                dio.direction = digitalio.Direction.OUTPUT
+                dio.value = False
+                self.select_pins.append(dio)
         self.num_select = len(self.select_pins)
 
         # Set up ADC — external I2C (ADS1115) or native (analogio)
@@ -876,7 +1288,8 @@ class MuxScanInput:
             self.adc_b = adcs[1]
             print("Mux ADC: ADS1115 A0=mux_a, A1=mux_b via I2C")
         else:
-            import analogio
+            if analogio is None:
+                raise ImportError("no module named 'analogio'")
             a_pin = getattr(board, mux_a_cfg.get("analog_pin", "GP26"), None)
             if a_pin:
                 self.adc_a = analogio.AnalogIn(a_pin)
@@ -909,93 +1322,117 @@ class MuxScanInput:
             mux_id = pad_cfg.get("mux", "a").lower()
             channel = pad_cfg.get("channel", 0)
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
 
-            self.pads.append({
-                "note": note_info,
-                "mux": mux_id,
-                "channel": channel,
-                "was_active": False,
-            })
+            self._notes.append(note_info)
+            self._mux.append(mux_id)
+            self._channel.append(channel)
+            self._was.append(0)
 
+        num_a = self._mux.count("a")
         print("Configured {} pads ({} on mux A, {} on mux B)".format(
-            len(self.pads),
-            sum(1 for p in self.pads if p["mux"] == "a"),
-            sum(1 for p in self.pads if p["mux"] == "b"),
-        ))
+            len(self._notes), num_a, len(self._notes) - num_a))
+
+        # Each pad's ADC, and pads grouped by channel: both muxes share the
+        # select pins but have their own ADC input, so one channel switch
+        # and settle serves the pads on mux A and mux B together.
+        self._adc = [self.adc_a if m == "a" else self.adc_b for m in self._mux]
+        by_channel = {}
+        for i in range(len(self._notes)):
+            by_channel.setdefault(self._channel[i], []).append(i)
+        self._scan_order = sorted(by_channel.items())
 
     def _set_channel(self, channel):
         """Set mux select pins to address a channel."""
+        if self._ch_sm is not None:
+            self._ch_buf[0] = channel
+            self._ch_sm.write(self._ch_buf)
+            return
+        pins = self.select_pins
         for i in range(self.num_select):
-            self.select_pins[i].value = bool(channel & (1 << i))
+            pins[i].value = (channel >> i) & 1
 
-    def _enable_mux(self, mux_id):
-        """Enable one mux, disable the other."""
+    def _enable_muxes(self, enabled):
+        """Enable or disable both muxes (enable pins are active low)."""
         if self.en_a:
-            self.en_a.value = (mux_id != "a")  # active low
+            self.en_a.value = not enabled
         if self.en_b:
-            self.en_b.value = (mux_id != "b")
-
-    def _read_channel(self, mux_id, channel):
-        """Read raw ADC value from a specific mux and channel."""
-        self._enable_mux(mux_id)
-        self._set_channel(channel)
-        # Settle time (use sleep for microsecond-range delays)
-        time.sleep(self.settle_us / 1_000_000)
-
-        if mux_id == "a" and self.adc_a:
-            return self.adc_a.value
-        elif mux_id == "b" and self.adc_b:
-            return self.adc_b.value
-        return 0
+            self.en_b.value = not enabled
+
+    def _build_velocity_table(self):
+        """Precompute velocity 1-127 for each top byte of a raw reading.
+
+        Scales threshold..65535 to 1..127. Call again if threshold changes.
+        """
+        table = bytearray(256)
+        max_range = 65535 - self.threshold
+        for b in range(256):
+            above = (b << 8) - self.threshold
+            if max_range <= 0:
+                v = 100
+            elif above <= 0:
+                v = 1
+            else:
+                v = max(1, min(127, int((above / max_range) * 126) + 1))
+            table[b] = v
+        self._raw_to_vel = table
 
     def _raw_to_velocity(self, raw):
         """Map raw ADC value above threshold to velocity 1-127."""
-        # Scale the range from threshold..65535 to 1..127
-        above = raw - self.threshold
-        max_range = 65535 - self.threshold
-        if max_range <= 0:
-            return 100
-        velocity = int((above / max_range) * 126) + 1
-        return max(1, min(127, velocity))
+        return self._raw_to_vel[raw >> 8]
 
     def scan(self):
         """Scan all pads through both muxes.
 
-        Returns (pressed_notes, released_notes). Each pressed note dict
-        has a "velocity" key derived from the analog reading.
+        Walks the channels in order, reading every pad on a channel (mux A
+        and mux B) after a single select + settle.
+
+        Returns (pressed, released). pressed holds (note, velocity)
+        tuples with velocity derived from the analog reading.
+        Both lists are reused: consume them before the next scan().
         """
-        pressed = []
-        released = []
+        pressed = self._pressed
+        released = self._released
+        pressed.clear()
+        released.clear()
+        notes = self._notes
+        adc = self._adc
+        was = self._was
+        threshold = self.threshold
+        settle_ns = self._settle_ns
+        monotonic_ns = time.monotonic_ns
+
+        self._enable_muxes(True)
+        for channel, pad_idxs in self._scan_order:
+            self._set_channel(channel)
+            # Busy-wait for the mux to settle (time.sleep can't do < 1 ms)
+            t0 = monotonic_ns()
+            while monotonic_ns() - t0 < settle_ns:
+                pass
 
-        for pad in self.pads:
-            raw = self._read_channel(pad["mux"], pad["channel"])
-            is_active = raw > self.threshold
+            for i in pad_idxs:
+                raw = adc[i].value if adc[i] else 0
+                is_active = raw > threshold
 
-            if is_active and not pad["was_active"]:
-                vel = self._raw_to_velocity(raw)
-                note_with_vel = dict(pad["note"])
-                note_with_vel["velocity"] = vel
-                pressed.append(note_with_vel)
-            elif not is_active and pad["was_active"]:
-                released.append(pad["note"])
+                if is_active and not was[i]:
+                    vel = self._raw_to_velocity(raw)
+                    pressed.append((notes[i], vel))
+                elif not is_active and was[i]:
+                    released.append(notes[i])
 
-            pad["was_active"] = is_active
+                was[i] = is_active
 
         # Disable both muxes after scan
-        if self.en_a:
-            self.en_a.value = True
-        if self.en_b:
-            self.en_b.value = True
+        self._enable_muxes(False)
 
         return pressed, released
 
     @property
     def count(self):
-        return len(self.pads)
+        return len(self._notes)
 
 
 # ---------------------------------------------------------------------------
@@ -1008,10 +1445,8 @@ def play_demo(player, notes, tempo_bpm=100):
     print("\n--- Demo: all {} notes ---".format(len(notes)))
 
     for note in notes:
-        name = "{}{}".format(note["name"], note["octave"])
-        midi = note["midi"]
-        ring = note.get("ring", "?")
-        print("  {} (MIDI {}, {})".format(name, midi, ring))
+        midi = note[_MIDI]
+        print("  {} (MIDI {}, {})".format(note[_DISPLAY], midi, note[_RING]))
         player.note_on(midi, velocity=90)
         time.sleep(beat * 0.8)
         # Don't explicitly stop - let notes overlap and decay naturally
@@ -1028,7 +1463,7 @@ def play_chord_demo(player, notes):
     print("\n--- Chord demo (polyphony test) ---")
 
     # Build MIDI lookup
-    midi_map = {n["midi"]: n for n in notes}
+    midi_map = {n[_MIDI]: n for n in notes}
 
     # C major chord: C4, E4, G4, C5
     chords = [
@@ -1059,6 +1494,125 @@ def play_chord_demo(player, notes):
     print("--- Chord demo complete ---\n")
 
 
+# ---------------------------------------------------------------------------
+# Play loop
+# ---------------------------------------------------------------------------
+
+# Adaptive scan pacing: 1 ms between scans while being played, backing
+# off by 0.5 ms per idle scan up to 20 ms (50 Hz) when nothing happens.
+SCAN_INTERVAL_ACTIVE = 0.001
+SCAN_INTERVAL_IDLE = 0.02
+SCAN_BACKOFF = 0.0005
+
+
+def scan_delay(idle_scans):
+    """Seconds to wait before the next scan after idle_scans quiet scans."""
+    if idle_scans == 0:
+        return SCAN_INTERVAL_ACTIVE
+    return min(SCAN_INTERVAL_IDLE, SCAN_BACKOFF * idle_scans)
+
+
+def next_scan_deadline(deadline_ns, delay):
+    """Advance a monotonic_ns scan deadline by delay seconds.
+
+    Returns (deadline_ns, wait): sleep for wait seconds, then scan. Time
+    spent scanning and playing comes out of the interval rather than
+    adding to it. If a scan overran its slot, the deadline restarts from
+    now (wait 0) instead of firing a burst of catch-up scans.
+    """
+    deadline_ns += int(delay * 1000000000)
+    now = time.monotonic_ns()
+    if deadline_ns <= now:
+        return now, 0
+    return deadline_ns, (deadline_ns - now) / 1000000000
+
+
+class EventLog:
+    """Fixed-size ring buffer of recent note events (no printing).
+
+    Entries are (monotonic_ns, midi, velocity) tuples; velocity is 0 for
+    releases. Inspect with recent() from the REPL after a Ctrl-C.
+    """
+
+    def __init__(self, size=32):
+        self._entries = [None] * size
+        self._pos = 0
+
+    def add(self, midi, velocity):
+        self._entries[self._pos] = (time.monotonic_ns(), midi, velocity)
+        self._pos = (self._pos + 1) % len(self._entries)
+
+    def recent(self):
+        """Return logged events, oldest first."""
+        ordered = self._entries[self._pos:] + self._entries[:self._pos]
+        return [e for e in ordered if e is not None]
+
+
+event_log = EventLog()
+
+
+def handle_events(player, pressed, released):
+    """Trigger notes for one scan's worth of input events."""
+    if pressed:
+        player.note_on_batch(pressed)
+    log = event_log.add
+    for note, vel in pressed:
+        log(note[_MIDI], vel)
+
+    for note in released:
+        log(note[_MIDI], 0)
+        # Don't stop notes on release - let them decay naturally
+        # like a real steel pan. Uncomment below to cut notes short:
+        # player.note_off(note[_MIDI])
+
+    if DEBUG and (pressed or released):
+        # One print per scan, after the notes have started: each print is
+        # a separate USB serial write
+        lines = ["  ON:  {} ({:.0f} Hz, vel={})".format(
+            note[_DISPLAY], note[_FREQ], vel) for note, vel in pressed]
+        lines.extend("  OFF: {}".format(note[_DISPLAY]) for note in released)
+        print("\n".join(lines))
+
+
+async def run_async(inputs, player):
+    """Scan inputs and trigger notes as two asyncio tasks.
+
+    The scan task only queues each scan's events; the play task handles
+    one scan's worth, then yields. A backlog of events therefore can't
+    hold off the next scan by more than one batch of note_on calls, but
+    a single slow note_on (e.g. a WAV file seek) still delays it.
+    """
+    events = []
+
+    async def scan_task():
+        scan = inputs.scan
+        idle_scans = 0
+        deadline = time.monotonic_ns()
+        while True:
+            pressed, released = scan()
+            if pressed or released:
+                # scan() reuses its lists, so queue copies
+                events.append((tuple(pressed), tuple(released)))
+                idle_scans = 0
+            else:
+                idle_scans += 1
+            deadline, wait = next_scan_deadline(
+                deadline, scan_delay(idle_scans))
+            await asyncio.sleep(wait)
+
+    async def play_task():
+        while True:
+            if events:
+                pressed, released = events.pop(0)
+                handle_events(player, pressed, released)
+            await asyncio.sleep(0)  # let the scan task run between batches
+
+    await asyncio.gather(
+        asyncio.create_task(scan_task()),
+        asyncio.create_task(play_task()),
+    )
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -1101,20 +1655,20 @@ def main():
     # Display layout by ring
     rings = {}
     for n in notes:
-        ring = n.get("ring", "unknown")
+        ring = n[_RING]
         if ring not in rings:
             rings[ring] = []
         rings[ring].append(n)
 
     for ring_name in ["outer", "central", "inner"]:
         if ring_name in rings:
-            names = ["{}{}".format(n["name"], n["octave"]) for n in rings[ring_name]]
+            names = [n[_DISPLAY] for n in rings[ring_name]]
             print("  {:8s}: {}".format(ring_name, ", ".join(names)))
 
     print("  Range: MIDI {}-{} ({}-{})".format(
-        notes[0]["midi"], notes[-1]["midi"],
-        midi_to_display(notes[0]["midi"]),
-        midi_to_display(notes[-1]["midi"]),
+        notes[0][_MIDI], notes[-1][_MIDI],
+        midi_to_display(notes[0][_MIDI]),
+        midi_to_display(notes[-1][_MIDI]),
     ))
 
     # Hardware config with defaults
@@ -1127,6 +1681,10 @@ def main():
     max_voices = hw_config.get("max_voices", 8)
     sample_rate = hw_config.get("sample_rate", 22050)
     sounds_dir = hw_config.get("sounds_dir", "sounds")
+    max_cached = hw_config.get("max_cached_notes", 12)
+    # 8 halves sample size and mixer bandwidth; WAVs must match
+    # (install.py --bits 8). Plenty for PWM output, audible on an I2S DAC.
+    bits_per_sample = hw_config.get("bits_per_sample", 16)
     pin_map = hw_config.get("pins", {})
 
     if audio_out == "i2s":
@@ -1156,6 +1714,8 @@ def main():
             max_voices=max_voices,
             sample_rate=sample_rate,
             sounds_dir=sounds_dir,
+            max_cached=max_cached,
+            bits_per_sample=bits_per_sample,
         )
         loaded = player.load_all(notes)
         if loaded == 0:
@@ -1222,23 +1782,27 @@ def main():
         led.value = True
 
     # Main loop - scan inputs, play/stop notes
+    if asyncio is not None:
+        asyncio.run(run_async(inputs, player))
+        return
+
+    # Bind methods to locals: a local load is cheaper than an attribute
+    # lookup every pass
+    scan = inputs.scan
+    sleep = time.sleep
+
+    idle_scans = 0
+    deadline = time.monotonic_ns()
     while True:
-        pressed, released = inputs.scan()
-
-        for note in pressed:
-            name = "{}{}".format(note["name"], note["octave"])
-            vel = note.get("velocity", 100)
-            print("  ON:  {} ({:.0f} Hz, vel={})".format(name, note["freq"], vel))
-            player.note_on(note["midi"], velocity=vel)
-
-        for note in released:
-            name = "{}{}".format(note["name"], note["octave"])
-            print("  OFF: {}".format(name))
-            # Don't stop notes on release - let them decay naturally
-            # like a real steel pan. Uncomment below to cut notes short:
-            # player.note_off(note["midi"])
-
-        time.sleep(0.02)  # 50 Hz scan rate
+        pressed, released = scan()
+        if pressed or released:
+            handle_events(player, pressed, released)
+            idle_scans = 0
+        else:
+            idle_scans += 1
+        deadline, wait = next_scan_deadline(deadline, scan_delay(idle_scans))
+        if wait:
+            sleep(wait)
 
 
 main()
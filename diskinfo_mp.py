@@ -34,29 +34,58 @@ def disk_info(path="/"):
     return total, used, free
 
 
+def _entries(path):
+    """Return sorted (name, is_dir, size) for a directory's entries.
+
+    Uses os.ilistdir, whose entries already carry the type and (on FAT
+    and littlefs) the size, so files need no separate os.stat call.
+    Entries without a size (or with -1, meaning unknown) are stat'ed;
+    falls back to listdir + stat where ilistdir is missing.
+    """
+    base = path.rstrip("/") + "/"
+    if hasattr(os, "ilistdir"):
+        entries = []
+        for ent in os.ilistdir(path):
+            name = ent[0]
+            is_dir = ent[1] == 0x4000
+            if len(ent) > 3 and ent[3] >= 0:
+                size = ent[3]
+            else:
+                try:
+                    size = os.stat(base + name)[6]
+                except OSError:
+                    continue
+            entries.append((name, is_dir, size))
+        entries.sort()
+        return entries
+
+    entries = []
+    for name in sorted(os.listdir(path)):
+        try:
+            st = os.stat(base + name)
+        except OSError:
+            continue
+        entries.append((name, st[0] & 0x4000, st[6]))
+    return entries
+
+
 def list_files(path="/", indent=0):
     """Recursively list files and directories with sizes."""
     total = 0
     prefix = "  " * indent
+    base = path.rstrip("/") + "/"
     try:
-        entries = sorted(os.listdir(path))
+        entries = _entries(path)
     except OSError:
         return 0
 
-    for name in entries:
-        full = path.rstrip("/") + "/" + name
-        try:
-            st = os.stat(full)
-        except OSError:
-            continue
-        is_dir = st[0] & 0x4000
+    for name, is_dir, size in entries:
         if is_dir:
             print("{}{}/".format(prefix, name))
-            sub = list_files(full, indent + 1)
+            sub = list_files(base + name, indent + 1)
             print("{}  ({})".format(prefix, fmt_size(sub)))
             total += sub
         else:
-            size = st[6]
             print("{}{:30s}  {}".format(prefix, name, fmt_size(size)))
             total += size
 
@@ -25,22 +25,40 @@ Usage:
 """
 
 import os
+import re
 import sys
 import json
 import wave
-import struct
+import array
+import math
+import hashlib
+import functools
+import mmap
 import shutil
 import argparse
 import zipfile
+import zlib
 import tempfile
+import threading
+from queue import Queue
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                as_completed)
 
 try:
     from urllib.request import urlopen, Request
-    from urllib.error import URLError
+    from urllib.error import URLError, HTTPError
     HAS_URLLIB = True
 except ImportError:
     HAS_URLLIB = False
 
+# Optional: numpy vectorizes the mixdown and resamples with a polyphase
+# FIR (StreamPolyResampler). Not required.
+try:
+    import numpy
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
@@ -63,6 +81,15 @@ TARGET_RATE = 22050
 TARGET_CHANNELS = 1
 TARGET_SAMPWIDTH = 2  # 16-bit
 
+# Source frames read per step when converting (bounds memory use)
+CONVERT_CHUNK_FRAMES = 1 << 15
+
+# Size of the RIFF/fmt/data header the wave module writes
+WAV_HEADER_BYTES = 44
+
+# Bump when convert_wav() output changes, so existing conversions redo
+CONVERTER_VERSION = 1
+
 # Default size budget for WAV sounds in MicroPython staging
 MP_SOUNDS_MAX_BYTES = 1024 * 1024  # 1 MB
 
@@ -71,102 +98,443 @@ MP_SOUNDS_MAX_BYTES = 1024 * 1024  # 1 MB
 # WAV conversion
 # ---------------------------------------------------------------------------
 
-def convert_wav(src_path, dst_path, target_rate=TARGET_RATE):
-    """Convert a WAV file to 16-bit mono at the target sample rate.
+def convert_wav(src_path, dst_path, target_rate=TARGET_RATE,
+                sampwidth=TARGET_SAMPWIDTH):
+    """Convert a WAV file to mono at the target sample rate.
 
-    Uses only the Python standard library (wave + struct) plus basic
-    linear interpolation for resampling. No numpy/scipy required.
+    Writes 16-bit signed samples, or 8-bit unsigned when sampwidth is 1
+    (CircuitPython with "bits_per_sample": 8).
+
+    The source is memory-mapped and decoded straight from slices of the
+    mapping, CONVERT_CHUNK_FRAMES frames at a time, so memory use doesn't
+    grow with the file. With numpy installed, blocks are resampled by
+    StreamPolyResampler, a Kaiser polyphase FIR whose output is
+    bit-identical to scipy.signal.resample_poly. Without numpy, only the
+    standard library is used: StreamResampler's linear interpolation, or
+    pair averaging for exact 2:1 downsampling.
+
+    Returns (n_samples, src_bytes, dst_bytes), so callers can report
+    sizes without stat'ing either file again.
     """
-    with wave.open(src_path, "rb") as src:
-        src_rate = src.getframerate()
-        src_channels = src.getnchannels()
-        src_nframes = src.getnframes()
-        src_width = src.getsampwidth()
-
-        # Read all frames as bytes
-        raw = src.readframes(src_nframes)
-
-    # Decode samples to list of integers
-    if src_width == 1:
-        # 8-bit unsigned
-        samples = [b - 128 for b in raw]
-        scale = 256  # scale up to 16-bit range
-    elif src_width == 2:
-        # 16-bit signed little-endian
-        samples = list(struct.unpack("<{}h".format(len(raw) // 2), raw))
-        scale = 1
-    elif src_width == 3:
-        # 24-bit signed - take top 16 bits
-        samples = []
-        for i in range(0, len(raw), 3):
-            val = raw[i] | (raw[i + 1] << 8) | (raw[i + 2] << 16)
-            if val >= 0x800000:
-                val -= 0x1000000
-            samples.append(val >> 8)
-        scale = 1
-    else:
-        raise ValueError("Unsupported sample width: {} bytes".format(src_width))
+    with open(src_path, "rb") as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+            memoryview(mm) as view:
+        src_bytes = len(view)
+        src_channels, src_rate, src_width, start, end = wav_pcm_span(view)
+        frame_bytes = src_channels * src_width
+        with wave.open(dst_path, "wb") as dst:
+            dst.setnchannels(TARGET_CHANNELS)
+            dst.setsampwidth(sampwidth)
+            dst.setframerate(target_rate)
+
+            block = CONVERT_CHUNK_FRAMES * frame_bytes
+            resampler = None
+            if src_rate != target_rate:
+                if HAS_NUMPY:
+                    resampler = StreamPolyResampler(src_rate, target_rate)
+                else:
+                    resampler = StreamResampler(src_rate, target_rate)
+
+            n_written = 0
+            for pos in range(start, end, block):
+                with view[pos:min(pos + block, end)] as raw:
+                    # Mix down to mono if stereo/multi-channel; numpy can
+                    # read native 16-bit frames straight from the mapping
+                    if src_channels == 1:
+                        samples = decode_pcm16(raw, src_width)
+                    elif (src_width == 2 and HAS_NUMPY
+                          and sys.byteorder == "little"):
+                        samples = mix_to_mono(raw, src_channels)
+                    else:
+                        samples = mix_to_mono(decode_pcm16(raw, src_width),
+                                              src_channels)
+
+                # Resample if rates differ
+                if resampler is not None:
+                    samples = resampler.feed(samples)
+
+                n_written += _write_samples(dst, samples, sampwidth)
+
+            if resampler is not None:
+                n_written += _write_samples(dst, resampler.flush(), sampwidth)
+
+    return n_written, src_bytes, WAV_HEADER_BYTES + n_written * sampwidth
+
+
+def wav_pcm_span(buf):
+    """Locate the PCM data in a WAV file's bytes.
+
+    buf is the whole file (e.g. a memoryview of an mmap). Walks the RIFF
+    chunks and returns (channels, rate, sampwidth, start, end), where
+    buf[start:end] is the sample data trimmed to whole frames. Raises
+    wave.Error if it isn't an uncompressed PCM WAV file.
+    """
+    if len(buf) < 12 or buf[0:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        raise wave.Error("not a WAV file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id = bytes(buf[pos:pos + 4])
+        size = int.from_bytes(buf[pos + 4:pos + 8], "little")
+        body = pos + 8
+        if chunk_id == b"fmt " and size >= 16:
+            tag = int.from_bytes(buf[body:body + 2], "little")
+            # 1 = PCM; 0xFFFE = WAVE_FORMAT_EXTENSIBLE (PCM subformat)
+            if tag not in (1, 0xFFFE):
+                raise wave.Error("unsupported WAV format tag {}".format(tag))
+            channels = int.from_bytes(buf[body + 2:body + 4], "little")
+            rate = int.from_bytes(buf[body + 4:body + 8], "little")
+            bits = int.from_bytes(buf[body + 14:body + 16], "little")
+            fmt = (channels, rate, (bits + 7) // 8)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise wave.Error("data chunk before fmt chunk")
+            channels, rate, width = fmt
+            frame_bytes = channels * width
+            if not frame_bytes:
+                raise wave.Error("bad fmt chunk")
+            length = min(size, len(buf) - body)
+            return fmt + (body, body + length - length % frame_bytes)
+        pos = body + size + (size & 1)  # chunks are word-aligned
+
+    raise wave.Error("no data chunk")
+
+
+def read_wav(path):
+    """Read a WAV file with a single read() and parse its header in place.
+
+    Returns (channels, rate, sampwidth, pcm), where pcm is a memoryview
+    of the sample data. Unlike the wave module, makes no small reads and
+    copies no frames; accepts anything wav_pcm_span() does.
+    """
+    with open(path, "rb") as f:
+        data = memoryview(f.read())
+    channels, rate, width, start, end = wav_pcm_span(data)
+    return channels, rate, width, data[start:end]
 
-    # Mix down to mono if stereo/multi-channel
-    if src_channels > 1:
-        mono = []
-        for i in range(0, len(samples), src_channels):
-            chunk = samples[i:i + src_channels]
-            mono.append(sum(chunk) // len(chunk))
-        samples = mono
 
-    # Scale to 16-bit if needed
-    if scale != 1:
-        samples = [s * scale for s in samples]
+def _write_samples(dst, samples, sampwidth):
+    """Append 16-bit samples to an open WAV writer. Returns the count.
 
-    # Resample if rates differ
-    if src_rate != target_rate:
-        samples = resample(samples, src_rate, target_rate)
+    samples is an array('h') (decode, mixdown and resample all produce
+    one), so every value is already in 16-bit range; no clamp is needed.
+    """
+    data = encode_pcm16(samples)
+    if sampwidth == 1:
+        # 8-bit WAV is unsigned: keep the top byte, offset by 128 (the
+        # same top-bit flip as decoding, so the same table)
+        data = data[1::2].translate(_U8_TO_S16_HIGH)
+    dst.writeframes(data)
+    return len(samples)
 
-    # Clamp to 16-bit range
-    samples = [max(-32768, min(32767, int(s))) for s in samples]
 
-    # Write output
-    with wave.open(dst_path, "wb") as dst:
-        dst.setnchannels(TARGET_CHANNELS)
-        dst.setsampwidth(TARGET_SAMPWIDTH)
-        dst.setframerate(target_rate)
-        dst.writeframes(struct.pack("<{}h".format(len(samples)), *samples))
+# 8-bit WAV byte (unsigned) -> high byte of the 16-bit signed equivalent
+_U8_TO_S16_HIGH = bytes((b - 128) & 0xFF for b in range(256))
 
-    return len(samples)
 
+def decode_pcm16(raw, width):
+    """Decode little-endian PCM bytes to an array('h') of 16-bit samples.
+
+    raw may be any bytes-like object, e.g. a memoryview of an mmap.
+
+    8-bit unsigned samples are scaled up and 24-bit samples keep their
+    top 16 bits. The bytes are rearranged with slicing and copied into
+    the array in one go; there is no per-sample Python loop.
+    """
+    if width == 1:
+        buf = bytearray(len(raw) * 2)
+        buf[1::2] = bytes(raw).translate(_U8_TO_S16_HIGH)
+    elif width == 2:
+        buf = raw
+    elif width == 3:
+        # Top 16 bits of each 24-bit sample are its 2nd and 3rd bytes
+        raw = raw[:len(raw) // 3 * 3]  # drop a partial trailing sample
+        if HAS_NUMPY:
+            # One strided copy of those byte pairs, about twice as fast
+            # as the two slice assignments
+            pairs = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(-1, 3)
+            buf = pairs[:, 1:].tobytes()
+        else:
+            buf = bytearray(len(raw) // 3 * 2)
+            buf[0::2] = raw[1::3]
+            buf[1::2] = raw[2::3]
+    else:
+        raise ValueError("Unsupported sample width: {} bytes".format(width))
+
+    samples = array.array("h")
+    samples.frombytes(buf)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
 
-def resample(samples, src_rate, dst_rate):
-    """Resample audio using linear interpolation.
 
-    Good enough for integer-ratio conversions like 44100 -> 22050.
-    For 2:1 downsampling, applies a simple averaging filter first.
+def mix_to_mono(samples, channels):
+    """Average interleaved frames of an array('h') into a mono array('h').
+
+    With numpy, vectorized column sums over an (n, channels) view of the
+    buffer, so samples may also be any buffer of native 16-bit PCM
+    (e.g. a memoryview of an mmap, read in place); otherwise per-channel
+    strided slices zipped back together. Both floor-divide, so the
+    result is the same either way.
+    """
+    if HAS_NUMPY:
+        frames = numpy.frombuffer(samples, dtype=numpy.int16).reshape(
+            -1, channels)
+        # Add whole columns: a reduction along the short channel axis
+        # runs per frame and is several times slower
+        mono = frames[:, 0].astype(numpy.int32)
+        for c in range(1, channels):
+            mono += frames[:, c]
+        mono //= channels
+        return array.array("h", mono.astype(numpy.int16).tobytes())
+
+    return array.array("h", [
+        sum(frame) // channels
+        for frame in zip(*[samples[c::channels] for c in range(channels)])])
+
+
+def average_pairs(samples, channels=1):
+    """Average adjacent frames of an interleaved array('h') pairwise.
+
+    Returns an array('h') of half the frames (a trailing odd frame is
+    dropped), each channel being (a + b) >> 1 of its pair. With numpy,
+    one vectorized pass over an (n, 2, channels) view; otherwise
+    per-channel strided slices, re-interleaved.
+    """
+    n_pairs = len(samples) // (channels * 2)
+    if HAS_NUMPY:
+        frames = numpy.frombuffer(samples, dtype=numpy.int16)
+        pairs = frames[:n_pairs * 2 * channels].reshape(
+            n_pairs, 2, channels).astype(numpy.int32)
+        out = (pairs[:, 0] + pairs[:, 1]) >> 1
+        return array.array("h", out.astype(numpy.int16).tobytes())
+
+    out = array.array("h", bytes(n_pairs * channels * 2))
+    for ch in range(channels):
+        chan = samples[ch::channels]
+        out[ch::channels] = array.array("h", [
+            (a + b) >> 1
+            for a, b in zip(chan[0:2 * n_pairs:2], chan[1::2])])
+    return out
+
+
+def encode_pcm16(samples):
+    """Encode 16-bit samples as little-endian PCM bytes.
+
+    Copies into an array('h') and dumps its buffer, rather than passing
+    every sample to struct.pack as a separate argument. An array('h')
+    (what the converter passes) is dumped directly on little-endian hosts.
     """
-    ratio = src_rate / dst_rate
-    src_len = len(samples)
-    dst_len = int(src_len / ratio)
-
-    # For exact 2:1 downsampling, average adjacent samples (anti-alias)
-    if src_rate == 2 * dst_rate:
-        result = []
-        for i in range(0, src_len - 1, 2):
-            result.append((samples[i] + samples[i + 1]) // 2)
-        return result
-
-    # General case: linear interpolation
-    result = []
-    for i in range(dst_len):
+    if sys.byteorder == "little":
+        if isinstance(samples, array.array) and samples.typecode == "h":
+            return samples.tobytes()
+        return array.array("h", samples).tobytes()
+    out = array.array("h", samples)
+    out.byteswap()
+    return out.tobytes()
+
+
+@functools.lru_cache(maxsize=8)
+def _poly_filter(up, down):
+    """Design StreamPolyResampler's filter for an up/down ratio.
+
+    Returns (half, phases): the filter's half-length and its taps split
+    into up phases. Cached, since the sounds of one install nearly all
+    share a sample rate; the array is made read-only as it is shared.
+    """
+    # Low-pass FIR as scipy.signal.firwin(2*half+1, 1/max(up, down),
+    # window=("kaiser", 5.0)), scaled by up for the zero-stuffing gain
+    max_rate = max(up, down)
+    half = 10 * max_rate
+    t = numpy.arange(-half, half + 1)
+    h = numpy.sinc(t / max_rate) * numpy.kaiser(2 * half + 1, 5.0)
+    h *= up / h.sum()
+
+    # Phase p holds taps p, p+up, p+2*up, ... reversed for a dot
+    # product with the input in forward order
+    taps = -(-len(h) // up)
+    phases = numpy.zeros(taps * up)
+    phases[:len(h)] = h
+    phases = phases.reshape(taps, up).T[:, ::-1]
+    phases.flags.writeable = False
+    return half, phases
+
+
+class StreamPolyResampler:
+    """numpy polyphase FIR resampler fed one block of samples at a time.
+
+    Same default filter as scipy.signal.resample_poly (Kaiser-windowed
+    sinc, beta 5, 10 zero crossings per side at the lower Nyquist) and
+    the same delay-compensated ceil(n * up / down) outputs, so it
+    matches resample_poly without needing scipy. Each output is a dot
+    product of one filter phase with the inputs it overlaps; the
+    zero-stuffed upsampled signal is never built. Inputs still needed
+    by later outputs are carried between feed() calls, so the result
+    doesn't depend on how the input is split. Output is array('h').
+    """
+
+    def __init__(self, src_rate, dst_rate):
+        g = math.gcd(src_rate, dst_rate)
+        up, down = dst_rate // g, src_rate // g
+        self.up = up
+        self.down = down
+        self.half, self.phases = _poly_filter(up, down)
+        self.taps = taps = self.phases.shape[1]
+
+        # Input history, starting with the zeros before the signal
+        self._hist = numpy.zeros(taps - 1)
+        self._base = 1 - taps  # input index of _hist[0]
+        self._n_in = 0
+        self._next = 0  # index of the next output sample
+
+    def feed(self, samples):
+        """Add input samples; return the output samples now complete."""
+        # Append with one converting copy (no float temporary)
+        kept = len(self._hist)
+        hist = numpy.empty(kept + len(samples))
+        hist[:kept] = self._hist
+        hist[kept:] = samples
+        self._hist = hist
+        self._n_in += len(samples)
+        # Output m needs inputs up to (m*down + half) // up
+        ready = -(-(self._n_in * self.up - self.half) // self.down)
+        return self._to_pcm(self._emit(max(ready, self._next)))
+
+    def flush(self):
+        """Finish the stream; return the final output samples."""
+        n_out = -(-self._n_in * self.up // self.down)
+        if n_out > self._next:
+            # Inputs past the end of the signal are zeros
+            need = (((n_out - 1) * self.down + self.half) // self.up + 1
+                    - self._base - len(self._hist))
+            if need > 0:
+                self._hist = numpy.concatenate(
+                    (self._hist, numpy.zeros(need)))
+        return self._to_pcm(self._emit(max(n_out, self._next)))
+
+    def _emit(self, stop):
+        """Compute outputs _next .. stop-1 as floats."""
+        if stop <= self._next:
+            return numpy.zeros(0)
+        up, down, taps = self.up, self.down, self.taps
+        # Output m sits at m*down + half in the upsampled signal, so it
+        # uses phase pos % up and inputs pos//up - taps + 1 .. pos//up
+        windows = numpy.lib.stride_tricks.sliding_window_view(
+            self._hist, taps)
+
+        # up and down are coprime, so outputs m, m+up, m+2*up, ... share
+        # a phase and their windows start exactly down inputs apart: each
+        # phase is one strided matrix-vector product (BLAS), with no copy
+        # of the windows
+        out = numpy.empty(stop - self._next)
+        for r in range(min(up, len(out))):
+            pos = (self._next + r) * down + self.half
+            first = pos // up - (taps - 1) - self._base
+            rows = windows[first::down][:len(out[r::up])]
+            out[r::up] = rows @ self.phases[pos % up]
+
+        # Drop inputs that no later output reaches back to
+        self._next = stop
+        keep = (stop * down + self.half) // up - (taps - 1)
+        if keep > self._base:
+            self._hist = self._hist[keep - self._base:]
+            self._base = keep
+        return out
+
+    @staticmethod
+    def _to_pcm(out):
+        # Round and clamp in place, then cast straight into the array('h')
+        numpy.rint(out, out=out)
+        numpy.clip(out, -32768, 32767, out=out)
+        pcm = array.array("h", bytes(2 * len(out)))
+        numpy.frombuffer(pcm, dtype=numpy.int16)[:] = out
+        return pcm
+
+
+class StreamResampler:
+    """Stdlib resampler fed one block of samples at a time.
+
+    Uses linear interpolation, or for exact 2:1 downsampling a simple
+    pair-averaging filter (anti-alias); good enough for 44100 -> 22050.
+    Output is identical however the input is split into blocks: samples
+    needed across a block boundary are carried over to the next feed().
+    """
+
+    def __init__(self, src_rate, dst_rate):
+        self.halve = src_rate == 2 * dst_rate
+        self.ratio = src_rate / dst_rate
+        self._pending = array.array("h")  # input not yet fully consumed
+        self._base = 0  # input index of _pending[0]
+        self._next = 0  # index of the next output sample
+
+    def feed(self, samples):
+        """Add input samples; return the output samples now complete."""
+        pending = self._pending + array.array("h", samples)
+
+        if self.halve:
+            # An odd trailing sample waits for its partner
+            out = average_pairs(pending)
+            self._pending = pending[2 * len(out):]
+            return out
+
+        # Emit every output whose two neighbouring inputs have arrived
+        # (the output length is only known at flush(), so never run past
+        # what the input so far would give)
+        end = self._base + len(pending)
+        out = self._emit(pending, int(end / self.ratio), end - 1)
+
+        # Keep input from the next output's left neighbour onwards
+        keep = min(int(self._next * self.ratio), end)
+        self._pending = pending[keep - self._base:]
+        self._base = keep
+        return out
+
+    def flush(self):
+        """Finish the stream; return the final output samples."""
+        if self.halve:
+            return array.array("h")  # a trailing odd sample is dropped
+
+        end = self._base + len(self._pending)
+        return self._emit(self._pending, int(end / self.ratio), end)
+
+    def _emit(self, pending, dst_len, stop):
+        """Interpolate outputs up to dst_len whose left input is < stop."""
+        i = self._next
+        out = array.array("h", bytes(2 * max(dst_len - i, 0)))
+        n = _interp_linear(pending, self._base, self.ratio, i, dst_len,
+                           stop, out)
+        del out[n:]
+        self._next = i + n
+        return out
+
+
+def _interp_linear(src, base, ratio, i, dst_len, stop, out):
+    """Linear-interpolation kernel behind StreamResampler.
+
+    Fills out[0:] with output samples i, i+1, ... (up to dst_len, while
+    the left input index is < stop) from src, which holds input samples
+    base onwards. Returns how many were written. Only runs without
+    numpy (with it, StreamPolyResampler is used instead).
+    """
+    end = base + len(src)
+    n = 0
+    while i < dst_len:
         src_pos = i * ratio
         idx = int(src_pos)
-        frac = src_pos - idx
-
-        if idx + 1 < src_len:
-            val = samples[idx] * (1.0 - frac) + samples[idx + 1] * frac
+        if idx >= stop:
+            break
+        if idx + 1 < end:
+            frac = src_pos - idx
+            val = src[idx - base] * (1.0 - frac) + src[idx + 1 - base] * frac
+        elif idx < end:
+            val = float(src[idx - base])
         else:
-            val = samples[idx] if idx < src_len else 0
-        result.append(int(val))
-
-    return result
+            val = 0.0
+        out[n] = int(val)
+        i += 1
+        n += 1
+    return n
 
 
 def trim_wav(src_path, dst_path, max_samples, fade_samples=1102):
@@ -177,32 +545,34 @@ def trim_wav(src_path, dst_path, max_samples, fade_samples=1102):
     If the file is already short enough, copies it unchanged.
     Returns the number of samples in the output file.
     """
-    with wave.open(src_path, "rb") as src:
-        params = src.getparams()
-        n_frames = src.getnframes()
-        raw = src.readframes(n_frames)
+    channels, rate, width, raw = read_wav(src_path)
 
     n_samples = len(raw) // 2
     if n_samples <= max_samples:
-        shutil.copy(src_path, dst_path)
+        copy_sound(src_path, dst_path)
         return n_samples
 
-    # Decode, truncate
-    samples = list(struct.unpack("<{}h".format(n_samples), raw))
-    samples = samples[:max_samples]
+    # Truncate, decode
+    samples = decode_pcm16(raw[:max_samples * 2], 2)
 
     # Apply linear fade-out over last fade_samples
     fade_len = min(fade_samples, len(samples))
-    for i in range(fade_len):
-        pos = len(samples) - fade_len + i
-        factor = 1.0 - (i / fade_len)
-        samples[pos] = int(samples[pos] * factor)
+    if HAS_NUMPY and fade_len:
+        # One ramp multiply, written back through a view of the array
+        tail = numpy.frombuffer(samples, dtype=numpy.int16)[-fade_len:]
+        ramp = 1.0 - numpy.arange(fade_len) / fade_len
+        tail[:] = tail * ramp  # truncates toward zero, like int()
+    else:
+        for i in range(fade_len):
+            pos = len(samples) - fade_len + i
+            factor = 1.0 - (i / fade_len)
+            samples[pos] = int(samples[pos] * factor)
 
     with wave.open(dst_path, "wb") as dst:
-        dst.setnchannels(params.nchannels)
-        dst.setsampwidth(params.sampwidth)
-        dst.setframerate(params.framerate)
-        dst.writeframes(struct.pack("<{}h".format(len(samples)), *samples))
+        dst.setnchannels(channels)
+        dst.setsampwidth(width)
+        dst.setframerate(rate)
+        dst.writeframes(encode_pcm16(samples))
 
     return len(samples)
 
@@ -253,21 +623,50 @@ def urbanpan_filename(name, octave):
     return "2-{}{}.wav".format(up, octave)
 
 
-def download_urbanpan(name, octave, dest_path):
-    """Download a forte sample from urbanPan GitHub. Returns True on success."""
+# Concurrent sample downloads; each is a small file, so latency-bound
+DOWNLOAD_WORKERS = 8
+
+# ETags of downloaded samples, kept in the source directory
+URBANPAN_CACHE_NAME = ".urbanpan_cache.json"
+
+
+def download_urbanpan(name, octave, dest_path, etags=None):
+    """Download a forte sample from urbanPan GitHub. Returns True on success.
+
+    etags, if given, maps urbanPan filenames to the ETag last seen for
+    each. If dest_path already exists and its ETag is known the request
+    is conditional: an unchanged sample comes back as 304 with no body
+    and the file is kept. New ETags are stored back into etags.
+    """
     if not HAS_URLLIB:
         return False
     fname = urbanpan_filename(name, octave)
     if fname is None:
         return False
     url = "{}/{}".format(URBANPAN_BASE_URL, fname)
+    headers = {"User-Agent": "rpiPan-installer"}
+    if etags and fname in etags and os.path.isfile(dest_path):
+        headers["If-None-Match"] = etags[fname]
+    # Streamed to a .part file first, so a dropped connection never
+    # leaves a truncated sample that a later run would take as complete
+    part_path = dest_path + ".part"
     try:
-        req = Request(url, headers={"User-Agent": "rpiPan-installer"})
-        resp = urlopen(req, timeout=30)
-        with open(dest_path, "wb") as f:
-            f.write(resp.read())
+        req = Request(url, headers=headers)
+        with urlopen(req, timeout=30) as resp:
+            with open(part_path, "wb") as f:
+                shutil.copyfileobj(resp, f, 1 << 16)
+            etag = resp.headers.get("ETag")
+        os.replace(part_path, dest_path)
+        if etags is not None and etag:
+            etags[fname] = etag
         return True
+    except HTTPError as e:
+        return e.code == 304 and "If-None-Match" in headers
     except Exception:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
         return False
 
 
@@ -276,65 +675,60 @@ def pitch_shift_octave_up(src_path, dest_path):
 
     Reads the source WAV, averages adjacent sample pairs (anti-alias),
     and writes at the same sample rate with half the samples.
-    Stdlib only (wave + struct). Handles mono and stereo input.
+    Stdlib only (wave + array). Handles mono and stereo input.
     Returns True on success.
     """
     try:
-        with wave.open(src_path, "rb") as src:
-            src_rate = src.getframerate()
-            channels = src.getnchannels()
-            width = src.getsampwidth()
-            n_frames = src.getnframes()
-            raw = src.readframes(n_frames)
+        channels, src_rate, width, raw = read_wav(src_path)
     except Exception:
         return False
 
     # Decode to 16-bit samples
-    if width == 2:
-        n_samples = len(raw) // 2
-        samples = list(struct.unpack("<{}h".format(n_samples), raw))
-    elif width == 1:
-        samples = [(b - 128) * 256 for b in raw]
-    elif width == 3:
-        samples = []
-        for i in range(0, len(raw), 3):
-            val = raw[i] | (raw[i + 1] << 8) | (raw[i + 2] << 16)
-            if val >= 0x800000:
-                val -= 0x1000000
-            samples.append(val >> 8)
-    else:
+    try:
+        samples = decode_pcm16(raw, width)
+    except ValueError:
         return False
 
     # Pitch-shift: average adjacent frame pairs (anti-alias + downsample)
-    samples_per_frame = channels
-    n_frame_pairs = len(samples) // (samples_per_frame * 2)
-
-    shifted = []
-    for i in range(n_frame_pairs):
-        base = i * samples_per_frame * 2
-        for ch in range(channels):
-            s1 = samples[base + ch]
-            s2 = samples[base + samples_per_frame + ch]
-            shifted.append((s1 + s2) // 2)
+    shifted = average_pairs(samples, channels)
 
     # Normalize to 82% peak to prevent clipping (matches panipuri)
     if shifted:
-        peak = max(abs(s) for s in shifted)
+        peak = max(max(shifted), -min(shifted))
         target_peak = int(32767 * 0.82)
         if peak > target_peak:
             scale = target_peak / peak
-            shifted = [int(s * scale) for s in shifted]
+            # Stays an array('h'), which encode_pcm16() dumps as is
+            shifted = array.array("h", [int(s * scale) for s in shifted])
 
     # Write output at same sample rate
     with wave.open(dest_path, "wb") as dst:
         dst.setnchannels(channels)
         dst.setsampwidth(2)
         dst.setframerate(src_rate)
-        dst.writeframes(struct.pack("<{}h".format(len(shifted)), *shifted))
+        dst.writeframes(encode_pcm16(shifted))
 
     return True
 
 
+def _shift_source(name, octave, source_dir):
+    """Find a lower-octave WAV to pitch-shift a note from.
+
+    Uses the lower octave's file in source_dir if present, else
+    downloads it to a temp file named after the note, so shifts can run
+    side by side. Returns (path, is_temp); path is None if neither
+    worked. The caller removes a temp file once done with it.
+    """
+    lower_path = os.path.join(source_dir, sound_filename(name, octave - 1))
+    if os.path.isfile(lower_path):
+        return lower_path, False
+    tmp_path = os.path.join(source_dir,
+                            "_tmp_lower_" + sound_filename(name, octave))
+    if download_urbanpan(name, octave - 1, tmp_path):
+        return tmp_path, True
+    return None, False
+
+
 def prepare_source_sounds(layout_path, source_dir, force=False, dry_run=False,
                           no_download=False):
     """Download or generate source WAV files for all notes in the layout.
@@ -344,7 +738,7 @@ def prepare_source_sounds(layout_path, source_dir, force=False, dry_run=False,
       2. Download from urbanPan GitHub repo (layer 2, forte)
       3. Pitch-shift from an octave-below sample
 
-    Uses only Python stdlib — no numpy or scipy needed.
+    Uses only Python stdlib — numpy is optional.
     Returns (available_filenames, stats_dict).
     """
     if not os.path.isfile(layout_path):
@@ -372,6 +766,9 @@ def prepare_source_sounds(layout_path, source_dir, force=False, dry_run=False,
     stats = {"exists": 0, "downloaded": 0, "shifted": 0, "failed": 0}
     available = []
     sym = {"exists": ".", "downloaded": "D", "shifted": "S", "failed": "!"}
+    to_download = []
+    queued = set()
+    to_shift = []
 
     for note in notes:
         name = note["name"]
@@ -401,47 +798,74 @@ def prepare_source_sounds(layout_path, source_dir, force=False, dry_run=False,
             available.append(fname)
             continue
 
-        # 2. Download from urbanPan
-        if download_urbanpan(name, octave, dest):
-            size = os.path.getsize(dest) // 1024
-            print("  D {:3s}{}  {:10s}  downloaded ({} KB)".format(
-                name, octave, fname, size))
-            stats["downloaded"] += 1
-            available.append(fname)
-            continue
+        # Enharmonic duplicates (C# / Db) share a file: fetch it once
+        if fname not in queued:
+            queued.add(fname)
+            to_download.append((name, octave, fname, dest))
+
+    # ETags from earlier runs, so --force re-fetches only changed samples
+    cache_path = os.path.join(source_dir, URBANPAN_CACHE_NAME)
+    try:
+        with open(cache_path) as f:
+            etags = json.load(f)
+    except (OSError, ValueError):
+        etags = {}
+    known_etags = dict(etags)
+
+    # 2. Download from urbanPan. Each request mostly waits on the network,
+    # so several run at once on threads.
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        fetched = pool.map(
+            lambda n: download_urbanpan(n[0], n[1], n[3], etags), to_download)
+        for (name, octave, fname, dest), ok in zip(to_download, fetched):
+            if ok:
+                size = os.path.getsize(dest) // 1024
+                print("  D {:3s}{}  {:10s}  downloaded ({} KB)".format(
+                    name, octave, fname, size))
+                stats["downloaded"] += 1
+                available.append(fname)
+            else:
+                # 3. Pitch-shift from lower octave, below
+                to_shift.append((name, octave, fname, dest))
+
+        # Lower octaves not already on disk are downloaded the same way
+        sources = list(pool.map(
+            lambda n: _shift_source(n[0], n[1], source_dir), to_shift))
 
-        # 3. Pitch-shift from lower octave
-        lower_octave = octave - 1
-        lower_fname = sound_filename(name, lower_octave)
-        lower_path = os.path.join(source_dir, lower_fname)
-
-        # Try existing lower-octave file in source dir
-        shifted = False
-        if os.path.isfile(lower_path):
-            if pitch_shift_octave_up(lower_path, dest):
-                shifted = True
-
-        # Try downloading the lower octave, then shift
-        if not shifted:
-            tmp_path = os.path.join(source_dir, "_tmp_lower.wav")
-            if download_urbanpan(name, lower_octave, tmp_path):
-                if pitch_shift_octave_up(tmp_path, dest):
-                    shifted = True
+    if etags != known_etags:
+        try:
+            with open(cache_path, "w") as f:
+                json.dump(etags, f, indent=1, sort_keys=True)
+        except OSError:
+            pass
+
+    # Each shift decodes and rewrites a whole file: once every source is
+    # on disk, spread them over the CPU cores like conversion
+    if to_shift:
+        with ProcessPoolExecutor() as pool:
+            jobs = [pool.submit(pitch_shift_octave_up, src, dest)
+                    if src else None
+                    for (src, _), (_, _, _, dest) in zip(sources, to_shift)]
+            results = [job.result() if job else False for job in jobs]
+
+        for (name, octave, fname, dest), (src, is_temp), shifted in zip(
+                to_shift, sources, results):
+            if is_temp:
                 try:
-                    os.remove(tmp_path)
+                    os.remove(src)
                 except OSError:
                     pass
 
-        if shifted:
-            size = os.path.getsize(dest) // 1024
-            print("  S {:3s}{}  {:10s}  shifted from {}{}  ({} KB)".format(
-                name, octave, fname, name, lower_octave, size))
-            stats["shifted"] += 1
-            available.append(fname)
-            continue
+            if shifted:
+                size = os.path.getsize(dest) // 1024
+                print("  S {:3s}{}  {:10s}  shifted from {}{}  ({} KB)".format(
+                    name, octave, fname, name, octave - 1, size))
+                stats["shifted"] += 1
+                available.append(fname)
+                continue
 
-        print("  ! {:3s}{}  {:10s}  FAILED".format(name, octave, fname))
-        stats["failed"] += 1
+            print("  ! {:3s}{}  {:10s}  FAILED".format(name, octave, fname))
+            stats["failed"] += 1
 
     # Summary
     print()
@@ -463,64 +887,154 @@ def prepare_source_sounds(layout_path, source_dir, force=False, dry_run=False,
 # Layout reading
 # ---------------------------------------------------------------------------
 
+NOTE_NAMES_FILE = (
+    "C", "Cs", "D", "Ds", "E", "F", "Fs", "G", "Gs", "A", "As", "B"
+)
+NOTE_NAMES_MAP = {
+    "C": 0, "C#": 1, "Db": 1,
+    "D": 2, "D#": 3, "Eb": 3,
+    "E": 4, "Fb": 4, "E#": 5,
+    "F": 5, "F#": 6, "Gb": 6,
+    "G": 7, "G#": 8, "Ab": 8,
+    "A": 9, "A#": 10, "Bb": 10,
+    "B": 11, "Cb": 11, "B#": 0,
+}
+# Note name -> WAV filename stem ("C#" -> "Cs"), built once
+NOTE_FILE_STEMS = {name: NOTE_NAMES_FILE[semitone]
+                   for name, semitone in NOTE_NAMES_MAP.items()}
+
+
 def get_needed_files(layout_path):
     """Read pan_layout.json and return list of WAV filenames needed."""
-    NOTE_NAMES_FILE = [
-        "C", "Cs", "D", "Ds", "E", "F", "Fs", "G", "Gs", "A", "As", "B"
-    ]
-    NOTE_NAMES_MAP = {
-        "C": 0, "C#": 1, "Db": 1,
-        "D": 2, "D#": 3, "Eb": 3,
-        "E": 4, "Fb": 4, "E#": 5,
-        "F": 5, "F#": 6, "Gb": 6,
-        "G": 7, "G#": 8, "Ab": 8,
-        "A": 9, "A#": 10, "Bb": 10,
-        "B": 11, "Cb": 11, "B#": 0,
-    }
-
     with open(layout_path, "r") as f:
         data = json.load(f)
 
-    filenames = []
+    # Stem within the note's own octave, so no MIDI round trip is
+    # needed; a set drops duplicates as they're found
+    stems = NOTE_FILE_STEMS
+    return sorted({
+        "{}{}.wav".format(stems[entry["name"]], entry["octave"])
+        for entry in data.get("notes", [])
+        if entry["name"] in stems})
+
+
+COMPILED_LAYOUT_NAME = "pan_layout_compiled.py"
+
+
+def compile_layout(layout_path, out_path):
+    """Write pan_layout.json as a Python module for code.py to import.
+
+    Saves CircuitPython from parsing JSON and sorting notes at boot.
+    NOTES holds (midi, name, octave, ring, idx) tuples sorted by MIDI;
+    HARDWARE is the "hardware" dict. SOURCE_CRC is the CRC-32 of the JSON
+    bytes, which code.py recomputes so an edited pan_layout.json still wins.
+    Notes outside MIDI 0-127 are dropped, as code.py's JSON loader does.
+    """
+    with open(layout_path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+
+    notes = []
     for entry in data.get("notes", []):
-        name = entry["name"]
-        octave = entry["octave"]
-        semitone = NOTE_NAMES_MAP.get(name)
+        semitone = NOTE_NAMES_MAP.get(entry["name"])
         if semitone is None:
             continue
-        midi = (octave + 1) * 12 + semitone
-        note_idx = midi % 12
-        oct = (midi // 12) - 1
-        fname = "{}{}.wav".format(NOTE_NAMES_FILE[note_idx], oct)
-        filenames.append(fname)
+        midi = (entry["octave"] + 1) * 12 + semitone
+        if not 0 <= midi < 128:
+            continue
+        notes.append((midi, entry["name"], entry["octave"],
+                      entry.get("ring", "unknown"), entry.get("idx", "")))
+    notes.sort()
+
+    lines = [
+        "# Generated by install.py from pan_layout.json - do not edit.",
+        "# Delete this file (or re-run install.py) after changing the JSON.",
+        "SOURCE_CRC = {}".format(zlib.crc32(raw)),
+        "NOTES = (",
+    ]
+    for note in notes:
+        lines.append("    {!r},".format(note))
+    lines.append(")")
+    lines.append("HARDWARE = {!r}".format(data.get("hardware", {})))
 
-    return sorted(set(filenames))
+    with open(out_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return len(notes)
 
 
 # ---------------------------------------------------------------------------
 # Install
 # ---------------------------------------------------------------------------
 
+def conversion_fingerprint(src_path, target_rate, sampwidth):
+    """Identify a conversion by source content and output settings.
+
+    Stored next to each converted WAV as "<name>.wav.meta"; a file is
+    reconverted whenever its fingerprint changes, rather than trusting
+    mtimes (which a git checkout or copy resets).
+    """
+    h = hashlib.sha1()
+    with open(src_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest() + _settings_tag(target_rate, sampwidth)
+
+
+def _settings_tag(target_rate, sampwidth):
+    """The output-settings tail of a conversion fingerprint."""
+    return "-{}-{}-{}-v{}".format(target_rate, TARGET_CHANNELS, sampwidth,
+                                  CONVERTER_VERSION)
+
+
+def _source_stamp(st):
+    """Size and mtime of a source file, as stored in its .meta."""
+    return "{}:{}".format(st.st_size, st.st_mtime_ns)
+
+
+def _read_meta(dst_path):
+    """Return (fingerprint, source stamp) stored for a converted WAV.
+
+    Either is None if missing; .meta files from before the stamp was
+    added hold only the fingerprint.
+    """
+    try:
+        with open(dst_path + ".meta") as f:
+            fields = f.read().split()
+    except OSError:
+        return None, None
+    fingerprint = fields[0] if fields else None
+    stamp = fields[1] if len(fields) > 1 else None
+    return fingerprint, stamp
+
+
+def _write_meta(dst_path, fingerprint, stamp):
+    """Record a converted WAV's fingerprint and source stamp."""
+    with open(dst_path + ".meta", "w") as f:
+        f.write("{}\n{}\n".format(fingerprint, stamp))
+
+
 def convert_samples(source_dir, converted_dir, layout_path, target_rate,
-                    dry_run=False, force=False, no_download=False):
+                    dry_run=False, force=False, no_download=False,
+                    sampwidth=TARGET_SAMPWIDTH, on_ready=None):
     """Convert WAV samples from source to converted directory.
 
     If the source directory is missing or incomplete, automatically
-    downloads sounds from urbanPan first.
+    downloads sounds from urbanPan first. on_ready, if given, is called
+    with each filename as soon as its converted file is usable (up to
+    date, or just converted), e.g. SoundCopier.put.
 
     Returns (available_files, success) where available_files is a list
     of filenames that were converted (or already up to date).
     """
     source_dir = os.path.abspath(source_dir)
 
-    # Auto-prepare source sounds if directory is missing or incomplete
+    # Auto-prepare source sounds if directory is missing or incomplete.
+    # One directory listing answers every "does it exist" question below.
     needs_prep = not os.path.isdir(source_dir)
     if not needs_prep and os.path.isfile(layout_path):
-        needed = get_needed_files(layout_path)
-        existing = [f for f in needed
-                    if os.path.isfile(os.path.join(source_dir, f))]
-        if len(existing) < len(needed):
-            needs_prep = True
+        present = _file_stats(source_dir)
+        needs_prep = any(f not in present
+                         for f in get_needed_files(layout_path))
 
     prepared_files = None
     if needs_prep and not no_download:
@@ -556,17 +1070,14 @@ def convert_samples(source_dir, converted_dir, layout_path, target_rate,
 
     # In dry-run with preparation, use the prepared list instead of filesystem
     if dry_run and prepared_files and not os.path.isdir(source_dir):
+        present = {}
         available = [f for f in needed if f in prepared_files]
         missing = [f for f in needed if f not in prepared_files]
     else:
-        available = []
-        missing = []
-        for fname in needed:
-            src = os.path.join(source_dir, fname)
-            if os.path.isfile(src):
-                available.append(fname)
-            else:
-                missing.append(fname)
+        # Listed again: preparation may have just added files
+        present = _file_stats(source_dir)
+        available = [f for f in needed if f in present]
+        missing = [f for f in needed if f not in present]
 
     if missing:
         print("WARNING: {} source files missing:".format(len(missing)))
@@ -586,39 +1097,75 @@ def convert_samples(source_dir, converted_dir, layout_path, target_rate,
     skipped = 0
     errors = 0
 
+    # Decide what needs converting here; workers only get real work
+    done = _file_sizes(converted_dir)
+    settings = _settings_tag(target_rate, sampwidth)
+    to_convert = []
+    fingerprints = {}
+    stamps = {}
     for fname in available:
         src = os.path.join(source_dir, fname)
         dst = os.path.join(converted_dir, fname)
 
         # In dry-run with prepared files, source may not exist on disk yet
-        src_exists = os.path.isfile(src)
-
-        if src_exists and os.path.isfile(dst) and not force:
-            src_mtime = os.path.getmtime(src)
-            dst_mtime = os.path.getmtime(dst)
-            if dst_mtime >= src_mtime:
+        src_exists = fname in present
+
+        if src_exists:
+            # Hashing reads the whole source: skip it while the source's
+            # size and mtime still match those recorded when it was last
+            # hashed. A changed stamp alone (e.g. a fresh checkout) only
+            # costs a rehash, not a reconversion.
+            stamps[fname] = stamp = _source_stamp(present[fname])
+            meta_fp, meta_stamp = (_read_meta(dst) if fname in done
+                                   else (None, None))
+            if meta_stamp == stamp and meta_fp.endswith(settings):
+                fingerprints[fname] = meta_fp
+            else:
+                fingerprints[fname] = conversion_fingerprint(
+                    src, target_rate, sampwidth)
+            if (fname in done and not force
+                    and meta_fp == fingerprints[fname]):
+                if meta_stamp != stamp and not dry_run:
+                    _write_meta(dst, meta_fp, stamp)
                 skipped += 1
+                if on_ready and not dry_run:
+                    on_ready(fname)
                 continue
 
-        src_size = os.path.getsize(src) / 1024 if src_exists else 0
-
         if dry_run:
             if src_exists:
-                print("  Would convert: {} ({:.0f} KB)".format(fname, src_size))
+                print("  Would convert: {} ({:.0f} KB)".format(
+                    fname, present[fname].st_size / 1024))
             else:
                 print("  Would convert: {}".format(fname))
             converted += 1
             continue
 
-        try:
-            n_samples = convert_wav(src, dst, target_rate)
-            dst_size = os.path.getsize(dst) / 1024
-            print("  {} ({:.0f}K -> {:.0f}K, {} samples)".format(
-                fname, src_size, dst_size, n_samples))
-            converted += 1
-        except Exception as e:
-            print("  ERROR converting {}: {}".format(fname, e))
-            errors += 1
+        to_convert.append(fname)
+
+    # Each file is independent and CPU-bound: convert them in parallel
+    if to_convert:
+        with ProcessPoolExecutor() as pool:
+            futures = {}
+            for fname in to_convert:
+                src = os.path.join(source_dir, fname)
+                dst = os.path.join(converted_dir, fname)
+                fut = pool.submit(convert_wav, src, dst, target_rate, sampwidth)
+                futures[fut] = fname
+            for fut in as_completed(futures):
+                fname = futures[fut]
+                try:
+                    n_samples, src_bytes, dst_bytes = fut.result()
+                    _write_meta(os.path.join(converted_dir, fname),
+                                fingerprints[fname], stamps[fname])
+                    print("  {} ({:.0f}K -> {:.0f}K, {} samples)".format(
+                        fname, src_bytes / 1024, dst_bytes / 1024, n_samples))
+                    converted += 1
+                    if on_ready:
+                        on_ready(fname)
+                except Exception as e:
+                    print("  ERROR converting {}: {}".format(fname, e))
+                    errors += 1
 
     print("\nConverted: {}, Skipped (up to date): {}, Errors: {}".format(
         converted, skipped, errors))
@@ -626,6 +1173,74 @@ def convert_samples(source_dir, converted_dir, layout_path, target_rate,
     return available, True
 
 
+def copy_sound(src, dst):
+    """Copy a converted WAV's bytes (no metadata) and return its size.
+
+    Uses os.copy_file_range where the OS has it, so the data never
+    passes through Python; if that is missing or refused (e.g. across
+    filesystems on older kernels), falls back to shutil.copyfile, which
+    uses sendfile/fcopyfile where it can.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                size = os.fstat(fsrc.fileno()).st_size
+                done = 0
+                while done < size:
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(),
+                                           size - done)
+                    if not n:
+                        break
+                    done += n
+            if done == size:
+                return size
+        except OSError:
+            pass
+    shutil.copyfile(src, dst)
+    return os.path.getsize(src)
+
+
+class SoundCopier:
+    """Copy converted WAVs to a sounds directory on a background thread.
+
+    Conversion is CPU-bound and copying to CIRCUITPY is USB-bound, so
+    install() feeds files in with put() while the rest still convert;
+    finish() waits for the queue to drain and returns {filename: bytes}
+    for every file copied. A file that fails to copy is left out (and
+    reported), so install_circuitpython() retries it.
+    """
+
+    def __init__(self, converted_dir, sounds_dst):
+        self.converted_dir = converted_dir
+        self.sounds_dst = sounds_dst
+        self.copied = {}
+        self._queue = Queue(maxsize=8)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, fname):
+        """Queue a converted file for copying."""
+        self._queue.put(fname)
+
+    def finish(self):
+        """Wait for queued copies; return {filename: size in bytes}."""
+        self._queue.put(None)
+        self._thread.join()
+        return self.copied
+
+    def _run(self):
+        while True:
+            fname = self._queue.get()
+            if fname is None:
+                return
+            src = os.path.join(self.converted_dir, fname)
+            try:
+                self.copied[fname] = copy_sound(
+                    src, os.path.join(self.sounds_dst, fname))
+            except OSError as e:
+                print("  ERROR copying {}: {}".format(fname, e))
+
+
 def stage_micropython(converted_dir, available, layout_path, dry_run=False,
                       max_sounds_bytes=MP_SOUNDS_MAX_BYTES):
     """Stage MicroPython files for upload via Thonny or mpremote.
@@ -696,47 +1311,46 @@ def stage_micropython(converted_dir, available, layout_path, dry_run=False,
     if not dry_run:
         os.makedirs(sounds_dst, exist_ok=True)
 
-    n_files = len([f for f in available
-                   if os.path.isfile(os.path.join(converted_dir, f))])
+    sizes = _file_sizes(converted_dir)
+    available = [f for f in available if f in sizes]
+    n_files = len(available)
 
     # Check if trimming is needed
-    current_sound_size = sum(
-        os.path.getsize(os.path.join(converted_dir, f))
-        for f in available
-        if os.path.isfile(os.path.join(converted_dir, f)))
+    current_sound_size = sum(sizes[f] for f in available)
 
     max_samples = None
     if current_sound_size > max_sounds_bytes and n_files > 0:
         # Calculate max samples per file to fit budget
         # Each file = max_samples * 2 (bytes) + 44 (header)
         bytes_per_file = max_sounds_bytes // n_files
-        max_samples = (bytes_per_file - 44) // 2
+        max_samples = (bytes_per_file - WAV_HEADER_BYTES) // 2
         if max_samples < 2205:  # minimum 0.1s
             max_samples = 2205
         duration = max_samples / TARGET_RATE
         print("  Trimming samples to {:.1f}s (sounds budget {:.1f} MB)".format(
             duration, max_sounds_bytes / 1024 / 1024))
 
-    copied = 0
+    copied = len(available)
     total_size = 0
-    for fname in available:
-        src = os.path.join(converted_dir, fname)
-        dst_file = os.path.join(sounds_dst, fname)
-        if not os.path.isfile(src):
-            continue
-        if dry_run:
-            if max_samples:
-                print("  Would trim: sounds/{}".format(fname))
-            else:
-                print("  Would copy: sounds/{}".format(fname))
-        else:
-            if max_samples:
-                trim_wav(src, dst_file, max_samples)
-            else:
-                shutil.copy(src, dst_file)
-            sz = os.path.getsize(dst_file)
-            total_size += sz
-        copied += 1
+    if dry_run:
+        for fname in available:
+            print("  Would {}: sounds/{}".format(
+                "trim" if max_samples else "copy", fname))
+    elif max_samples:
+        # Each trim decodes and fades a whole file: spread them over the
+        # CPU cores, as convert_samples() does for conversion
+        with ProcessPoolExecutor() as pool:
+            jobs = [pool.submit(trim_wav, os.path.join(converted_dir, fname),
+                                os.path.join(sounds_dst, fname), max_samples)
+                    for fname in available]
+            for job in jobs:
+                job.result()
+        total_size = sum(os.path.getsize(os.path.join(sounds_dst, fname))
+                         for fname in available)
+    else:
+        for fname in available:
+            total_size += copy_sound(os.path.join(converted_dir, fname),
+                                     os.path.join(sounds_dst, fname))
 
     print("  sounds/ ({} files, {:.0f} KB total)".format(
         copied, total_size / 1024))
@@ -893,9 +1507,31 @@ def _upload_mpremote(staging):
     return True
 
 
+def _file_stats(path):
+    """Map each regular file in a directory to its os.stat_result.
+
+    Empty if the directory is missing. One scandir pass, whose entries
+    carry the stat on Windows and cache it elsewhere.
+    """
+    try:
+        with os.scandir(path) as it:
+            return {e.name: e.stat() for e in it if e.is_file()}
+    except OSError:
+        return {}
+
+
+def _file_sizes(path):
+    """Map each regular file in a directory to its size (empty if none)."""
+    return {name: st.st_size for name, st in _file_stats(path).items()}
+
+
 def install_circuitpython(drive_path, converted_dir, available, layout_path,
-                          dry_run=False):
-    """Copy CircuitPython files to CIRCUITPY drive."""
+                          dry_run=False, precopied=None):
+    """Copy CircuitPython files to CIRCUITPY drive.
+
+    precopied is SoundCopier.finish()'s {filename: bytes} for sounds
+    already copied while converting; those aren't copied again.
+    """
     code_path = os.path.join(SCRIPT_DIR, "code.py")
 
     if not os.path.isdir(drive_path):
@@ -906,13 +1542,19 @@ def install_circuitpython(drive_path, converted_dir, available, layout_path,
 
     print("\n--- Installing to {} ---".format(drive_path))
 
+    # Sizes come from the local sources, not a stat of each file just
+    # written over USB mass storage
+    written = 0
+
     # 1. Copy code.py
     dst = os.path.join(drive_path, "code.py")
     if dry_run:
         print("  Would copy: code.py")
     else:
         shutil.copy(code_path, dst)
-        print("  code.py ({:.0f} KB)".format(os.path.getsize(dst) / 1024))
+        size = os.path.getsize(code_path)
+        written += size
+        print("  code.py ({:.0f} KB)".format(size / 1024))
 
     # 2. Copy pan_layout.json
     dst = os.path.join(drive_path, "pan_layout.json")
@@ -920,47 +1562,60 @@ def install_circuitpython(drive_path, converted_dir, available, layout_path,
         print("  Would copy: pan_layout.json")
     else:
         shutil.copy(layout_path, dst)
-        print("  pan_layout.json ({:.0f} KB)".format(os.path.getsize(dst) / 1024))
+        size = os.path.getsize(layout_path)
+        written += size
+        print("  pan_layout.json ({:.0f} KB)".format(size / 1024))
+
+    # 3. Pre-compiled layout module (skips JSON parsing at boot)
+    dst = os.path.join(drive_path, COMPILED_LAYOUT_NAME)
+    if dry_run:
+        print("  Would write: {}".format(COMPILED_LAYOUT_NAME))
+    else:
+        n_notes = compile_layout(layout_path, dst)
+        print("  {} ({} notes)".format(COMPILED_LAYOUT_NAME, n_notes))
 
-    # 3. Copy converted sounds/
+    # 4. Copy converted sounds/
     sounds_dst = os.path.join(drive_path, "sounds")
     if not dry_run:
         os.makedirs(sounds_dst, exist_ok=True)
 
+    # Sounds only need their bytes: copy_sound() skips copy()'s chmod,
+    # which FAT ignores anyway; one listing of the source says what exists
+    sizes = _file_sizes(converted_dir)
+    precopied = precopied or {}
     copied = 0
     total_size = 0
     for fname in available:
-        src = os.path.join(converted_dir, fname)
-        dst = os.path.join(sounds_dst, fname)
-        if not os.path.isfile(src):
+        if fname in precopied:
+            total_size += precopied[fname]
+        elif fname not in sizes:
             continue
-        if dry_run:
+        elif dry_run:
             print("  Would copy: sounds/{}".format(fname))
         else:
-            shutil.copy(src, dst)
-            sz = os.path.getsize(dst)
-            total_size += sz
+            total_size += copy_sound(os.path.join(converted_dir, fname),
+                                     os.path.join(sounds_dst, fname))
         copied += 1
 
     print("  sounds/ ({} files, {:.0f} KB total)".format(
         copied, total_size / 1024))
+    written += total_size
 
     # Summary
-    drive_used = sum(
-        os.path.getsize(os.path.join(dp, f))
-        for dp, dirs, files in os.walk(drive_path)
-        for f in files
-    ) if not dry_run else 0
+    # One statvfs call; walking every file over USB mass storage is slow
+    drive_used = shutil.disk_usage(drive_path).used if not dry_run else 0
 
     print("\n" + "=" * 50)
     if dry_run:
         print("DRY RUN complete. No files were modified.")
     else:
         print("Install complete!")
+        print("  Installed: {:.0f} KB".format(written / 1024))
         print("  Drive usage: {:.0f} KB".format(drive_used / 1024))
     print("  Files on Pico:")
     print("    code.py")
     print("    pan_layout.json")
+    print("    {}".format(COMPILED_LAYOUT_NAME))
     print("    sounds/ ({} WAV files)".format(copied))
     print("\nThe Pico should restart automatically and play the demo.")
 
@@ -969,7 +1624,8 @@ def install_circuitpython(drive_path, converted_dir, available, layout_path,
 
 def install(drive_path, source_dir, platform="micropython", dry_run=False,
             convert_only=False, target_rate=TARGET_RATE, force=False,
-            max_sounds_bytes=MP_SOUNDS_MAX_BYTES, no_download=False):
+            max_sounds_bytes=MP_SOUNDS_MAX_BYTES, no_download=False,
+            sampwidth=TARGET_SAMPWIDTH):
     """Convert samples and install to Pico."""
 
     layout_path = os.path.join(SCRIPT_DIR, "pan_layout.json")
@@ -981,16 +1637,26 @@ def install(drive_path, source_dir, platform="micropython", dry_run=False,
     print("  Platform:       {}".format(platform))
     print("  Source sounds:  {}".format(source_dir))
     print("  Convert to:     {} Hz, {}-bit, mono".format(
-        target_rate, TARGET_SAMPWIDTH * 8))
+        target_rate, sampwidth * 8))
     print("  Staging dir:    {}".format(converted_dir))
     if not convert_only and platform == "circuitpython":
         print("  Target drive:   {}".format(drive_path))
     print()
 
+    # Copy sounds to CIRCUITPY while the rest are still converting
+    copier = None
+    if (platform == "circuitpython" and not convert_only and not dry_run
+            and os.path.isdir(drive_path)):
+        sounds_dst = os.path.join(drive_path, "sounds")
+        os.makedirs(sounds_dst, exist_ok=True)
+        copier = SoundCopier(converted_dir, sounds_dst)
+
     # Convert samples (auto-downloads from urbanPan if source is incomplete)
     available, success = convert_samples(
         source_dir, converted_dir, layout_path, target_rate,
-        dry_run=dry_run, force=force, no_download=no_download)
+        dry_run=dry_run, force=force, no_download=no_download,
+        sampwidth=sampwidth, on_ready=copier.put if copier else None)
+    precopied = copier.finish() if copier else None
 
     if not success:
         return False
@@ -1007,7 +1673,8 @@ def install(drive_path, source_dir, platform="micropython", dry_run=False,
                                  max_sounds_bytes=max_sounds_bytes)
     else:
         return install_circuitpython(drive_path, converted_dir, available,
-                                     layout_path, dry_run=dry_run)
+                                     layout_path, dry_run=dry_run,
+                                     precopied=precopied)
 
 
 # ---------------------------------------------------------------------------
@@ -1022,6 +1689,12 @@ REQUIRED_LIBS = [
 
 BUNDLE_REPO = "adafruit/Adafruit_CircuitPython_Bundle"
 BUNDLE_API_URL = "https://api.github.com/repos/{}/releases/latest".format(BUNDLE_REPO)
+# Last release info and its ETag, for a conditional request next time
+BUNDLE_RELEASE_CACHE = os.path.join(SCRIPT_DIR, ".bundle_release.json")
+
+
+# "Adafruit CircuitPython 9.2.1 on 2024-11-20; ..." in boot_out.txt
+_CP_VERSION_RE = re.compile(r"CircuitPython\s+(\d+)\.\d+")
 
 
 def detect_cp_version(drive_path):
@@ -1037,16 +1710,11 @@ def detect_cp_version(drive_path):
         text = f.read()
 
     # Look for "CircuitPython X.Y.Z"
-    for word in text.split():
-        parts = word.split(".")
-        if len(parts) >= 2:
-            try:
-                major = int(parts[0])
-                int(parts[1])  # verify second part is also a number
-                if 5 <= major <= 15:  # sanity check
-                    return major
-            except ValueError:
-                continue
+    m = _CP_VERSION_RE.search(text)
+    if m:
+        major = int(m.group(1))
+        if 5 <= major <= 15:  # sanity check
+            return major
     return None
 
 
@@ -1075,6 +1743,41 @@ def try_circup(libs):
         return False
 
 
+def fetch_bundle_release():
+    """Return the latest bundle release info from the GitHub API.
+
+    Sends the ETag of the last response (BUNDLE_RELEASE_CACHE) as
+    If-None-Match; if the release hasn't changed GitHub answers 304
+    with no body, which also doesn't count against its rate limit.
+    Raises on network errors, like urlopen.
+    """
+    headers = {"User-Agent": "rpiPan-installer"}
+    try:
+        with open(BUNDLE_RELEASE_CACHE) as f:
+            cached = json.load(f)
+        headers["If-None-Match"] = cached["etag"]
+    except (OSError, ValueError, KeyError, TypeError):
+        cached = None
+
+    try:
+        with urlopen(Request(BUNDLE_API_URL, headers=headers),
+                     timeout=30) as resp:
+            release = json.loads(resp.read().decode())
+            etag = resp.headers.get("ETag")
+    except HTTPError as e:
+        if e.code == 304 and cached:
+            return cached["release"]
+        raise
+
+    if etag:
+        try:
+            with open(BUNDLE_RELEASE_CACHE, "w") as f:
+                json.dump({"etag": etag, "release": release}, f)
+        except OSError:
+            pass
+    return release
+
+
 def download_bundle_libs(drive_path, cp_version, libs, dry_run=False):
     """Download Adafruit CircuitPython Bundle and extract required libraries.
 
@@ -1091,9 +1794,7 @@ def download_bundle_libs(drive_path, cp_version, libs, dry_run=False):
     # Get latest release info from GitHub API
     print("Fetching latest bundle release...")
     try:
-        req = Request(BUNDLE_API_URL, headers={"User-Agent": "rpiPan-installer"})
-        resp = urlopen(req, timeout=30)
-        release = json.loads(resp.read().decode())
+        release = fetch_bundle_release()
     except Exception as e:
         print("ERROR: Could not fetch release info: {}".format(e))
         return False
@@ -1121,33 +1822,34 @@ def download_bundle_libs(drive_path, cp_version, libs, dry_run=False):
         print("Would download and extract: {}".format(", ".join(libs)))
         return True
 
-    # Download the bundle zip
+    # Download the bundle zip straight to a temp file, then extract
     print("Downloading ({})...".format(target_name))
+    tmp = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+    tmp_path = tmp.name
     try:
-        req = Request(download_url, headers={"User-Agent": "rpiPan-installer"})
-        resp = urlopen(req, timeout=120)
-        bundle_data = resp.read()
+        with tmp:
+            req = Request(download_url, headers={"User-Agent": "rpiPan-installer"})
+            with urlopen(req, timeout=120) as resp:
+                shutil.copyfileobj(resp, tmp, 1 << 16)
     except Exception as e:
         print("ERROR: Download failed: {}".format(e))
+        os.unlink(tmp_path)
         return False
 
-    print("Downloaded {:.1f} MB".format(len(bundle_data) / 1024 / 1024))
+    print("Downloaded {:.1f} MB".format(os.path.getsize(tmp_path) / 1024 / 1024))
 
     # Extract required libraries to CIRCUITPY/lib/
     lib_dir = os.path.join(drive_path, "lib")
     os.makedirs(lib_dir, exist_ok=True)
 
-    # Write zip to temp file, then extract
-    with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-        tmp.write(bundle_data)
-        tmp_path = tmp.name
-
     try:
         extracted = 0
         with zipfile.ZipFile(tmp_path, "r") as zf:
+            names = zf.namelist()
+
             # Find the bundle prefix (e.g. "adafruit-circuitpython-bundle-9.x-mpy-20240101/lib/")
             prefix = None
-            for name in zf.namelist():
+            for name in names:
                 if "/lib/" in name:
                     prefix = name[:name.index("/lib/") + 5]
                     break
@@ -1156,34 +1858,39 @@ def download_bundle_libs(drive_path, cp_version, libs, dry_run=False):
                 print("ERROR: Could not find lib/ directory in bundle")
                 return False
 
+            # Group the bundle's entries by library in one pass, rather than
+            # scanning all of them again for each library. Libraries can be
+            # directories (packages) or single .mpy files.
+            by_lib = {}
+            plen = len(prefix)
+            for name in names:
+                if not name.startswith(prefix):
+                    continue
+                rest = name[plen:]
+                if "/" in rest:
+                    top = rest.split("/", 1)[0]
+                elif rest.endswith(".mpy"):
+                    top = rest[:-4]
+                else:
+                    continue
+                by_lib.setdefault(top, []).append(name)
+
             for lib_name in libs:
-                # Libraries can be directories (packages) or single .mpy files
-                lib_prefix = prefix + lib_name
-                found_files = [
-                    n for n in zf.namelist()
-                    if n.startswith(lib_prefix + "/") or n == lib_prefix + ".mpy"
-                ]
+                found_files = by_lib.get(lib_name, [])
 
                 if not found_files:
                     print("  WARNING: {} not found in bundle".format(lib_name))
                     continue
 
                 for zip_path in found_files:
-                    # Strip the bundle prefix to get the relative path under lib/
-                    rel_path = zip_path[len(prefix):]
-                    if not rel_path or zip_path.endswith("/"):
-                        # Directory entry — create it
-                        dir_path = os.path.join(lib_dir, rel_path)
-                        os.makedirs(dir_path, exist_ok=True)
-                        continue
-
-                    dst_path = os.path.join(lib_dir, rel_path)
-                    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
-
-                    with zf.open(zip_path) as src_f:
-                        with open(dst_path, "wb") as dst_f:
-                            dst_f.write(src_f.read())
-                    extracted += 1
+                    # Strip the bundle prefix so zipfile extracts straight
+                    # into lib/; extract() makes parent directories, streams
+                    # the data and rejects unsafe paths
+                    info = zf.getinfo(zip_path)
+                    info.filename = zip_path[plen:]
+                    zf.extract(info, lib_dir)
+                    if not info.is_dir():
+                        extracted += 1
 
                 print("  Installed: {} ({} files)".format(
                     lib_name, len([f for f in found_files if not f.endswith("/")])))
@@ -1203,13 +1910,16 @@ def install_libs(drive_path, dry_run=False):
     print("\n--- Installing CircuitPython libraries ---")
     print("Required: {}".format(", ".join(REQUIRED_LIBS)))
 
-    # Check if libraries already exist
+    # Check if libraries already exist: one listing of lib/ rather than
+    # two stats per library over USB
     lib_dir = os.path.join(drive_path, "lib")
+    try:
+        present = set(os.listdir(lib_dir))
+    except OSError:
+        present = set()
     all_present = True
     for lib_name in REQUIRED_LIBS:
-        lib_path = os.path.join(lib_dir, lib_name)
-        mpy_path = os.path.join(lib_dir, lib_name + ".mpy")
-        if os.path.exists(lib_path) or os.path.exists(mpy_path):
+        if lib_name in present or lib_name + ".mpy" in present:
             print("  Already installed: {}".format(lib_name))
         else:
             all_present = False
@@ -1267,6 +1977,11 @@ def main():
         "--rate", type=int, default=TARGET_RATE,
         help="Target sample rate in Hz (default: {})".format(TARGET_RATE),
     )
+    parser.add_argument(
+        "--bits", type=int, choices=[8, 16], default=TARGET_SAMPWIDTH * 8,
+        help="Sample bit depth (default: 16). 8 is CircuitPython only and "
+             "needs \"bits_per_sample\": 8 in pan_layout.json",
+    )
     parser.add_argument(
         "--dry-run", action="store_true",
         help="Show what would be done without making changes",
@@ -1302,6 +2017,11 @@ def main():
 
     args = parser.parse_args()
 
+    if args.bits == 8 and args.platform == "micropython":
+        print("ERROR: --bits 8 is CircuitPython only (the MicroPython mixer")
+        print("  reads 16-bit samples).")
+        sys.exit(1)
+
     # Handle --libs for MicroPython
     if args.platform == "micropython" and (args.libs or args.libs_only):
         print("MicroPython does not need external libraries.")
@@ -1338,6 +2058,7 @@ def main():
         force=args.force,
         max_sounds_bytes=int(args.max_sounds_mb * 1024 * 1024),
         no_download=args.no_download,
+        sampwidth=args.bits // 8,
     )
 
     # Install CircuitPython libraries if requested
@@ -34,9 +34,10 @@ The sounds/ directory should contain files named like the panipuri project:
 import json
 import time
 import sys
-import struct
 import array
 import machine
+import micropython
+from micropython import const
 import _thread
 import os
 import select
@@ -142,26 +143,40 @@ def note_to_midi(name, octave):
     semitone = NOTE_NAMES.get(name)
     if semitone is None:
         return None
-    return (octave + 1) * 12 + semitone
+    midi = (octave + 1) * 12 + semitone
+    if not 0 <= midi < 128:
+        return None
+    return midi
+
+
+# Frequency, filename and display strings for every MIDI note 0-127
+# (A4 = 440 Hz), built once so layout loading does no pow/format work.
+_MIDI_FREQ = tuple(440.0 * (2.0 ** ((m - 69) / 12.0)) for m in range(128))
+_FILE_NAMES = tuple(
+    "{}{}.wav".format(NOTE_NAMES_FILE[m % 12], m // 12 - 1) for m in range(128))
+_DISPLAY_NAMES = tuple(
+    "{}{}".format(NOTE_NAMES_DISPLAY[m % 12], m // 12 - 1) for m in range(128))
 
 
 def midi_to_freq(midi_note):
     """Convert MIDI note number to frequency in Hz (A4 = 440 Hz)."""
-    return 440.0 * (2.0 ** ((midi_note - 69) / 12.0))
+    if 0 <= midi_note < 128:
+        return _MIDI_FREQ[midi_note]
+    return None
 
 
 def midi_to_filename(midi_note):
     """Convert MIDI note to WAV filename (e.g. 60 -> 'C4.wav')."""
-    octave = (midi_note // 12) - 1
-    note_idx = midi_note % 12
-    return "{}{}.wav".format(NOTE_NAMES_FILE[note_idx], octave)
+    if 0 <= midi_note < 128:
+        return _FILE_NAMES[midi_note]
+    return None
 
 
 def midi_to_display(midi_note):
     """Convert MIDI note to display name (e.g. 60 -> 'C4')."""
-    octave = (midi_note // 12) - 1
-    note_idx = midi_note % 12
-    return "{}{}".format(NOTE_NAMES_DISPLAY[note_idx], octave)
+    if 0 <= midi_note < 128:
+        return _DISPLAY_NAMES[midi_note]
+    return None
 
 
 # ---------------------------------------------------------------------------
@@ -300,18 +315,14 @@ class WavReader:
         if to_read <= 0:
             return 0
 
-        n_bytes = to_read * 2
-        raw = self.file.read(n_bytes)
-        actual = len(raw) // 2
-        if actual == 0:
+        # Read straight into the int16 array: 16-bit little-endian PCM
+        # is already the RP2040's native layout, so there is nothing to
+        # decode and no bytes object is allocated on the audio core
+        n_bytes = self.file.readinto(buf, to_read * 2)
+        if not n_bytes:
             return 0
-
-        # Copy raw bytes into array via memoryview
-        mv = memoryview(buf)
-        mv_bytes = mv.cast("B")
-        mv_bytes[:len(raw)] = raw
-        self.pos += len(raw)
-        return actual
+        self.pos += n_bytes
+        return n_bytes // 2
 
     def rewind(self):
         """Seek back to the start of audio data."""
@@ -330,7 +341,12 @@ class WavReader:
 # Software audio mixer with I2S output
 # ---------------------------------------------------------------------------
 
-CHUNK_SIZE = 512  # samples per mixing chunk (~23ms at 22050 Hz)
+CHUNK_SIZE = const(512)  # samples per mixing chunk (~23ms at 22050 Hz)
+
+SCAN_INTERVAL_MS = const(20)  # main loop input scan period (50 Hz)
+
+# Velocity (0-127) -> fixed-point volume 0-256, curve for natural dynamics
+_VEL_FP = tuple(int(((v / 127.0) ** 0.7) * 256) for v in range(128))
 
 
 class Voice:
@@ -411,19 +427,25 @@ class MixEngine:
         # Voices
         self.voices = [Voice(CHUNK_SIZE) for _ in range(max_voices)]
         self._next_voice = 0
+        # midi_note -> voice index, so note lookups don't walk the voices
+        self._note_to_voice = {}
 
         # WAV file path cache: midi_note -> file path
         self._path_cache = {}
 
         # Mix output buffers
-        self._mix_buf = array.array("h", [0] * CHUNK_SIZE)
-        self._out_bytes = bytearray(CHUNK_SIZE * 2)
+        # 32-bit accumulator so sums of voices don't wrap before the clamp;
+        # the clamped int16 output buffer goes to I2S as-is (the RP2040 is
+        # little-endian, matching the I2S sample format)
+        self._mix_buf = array.array("i", [0] * CHUNK_SIZE)
+        self._out_buf = array.array("h", [0] * CHUNK_SIZE)
 
         # Thread communication
         self._lock = _thread.allocate_lock()
         self._running = False
         self._pending_on = []
         self._pending_off = []
+        self._pending_all_off = False
 
     def load_note(self, midi_note, filename):
         """Register a WAV file path for a note. Returns True if file exists."""
@@ -450,7 +472,7 @@ class MixEngine:
 
     def note_on(self, midi_note, velocity=100):
         """Queue a note-on event (called from main thread)."""
-        vol_fp = int(((velocity / 127.0) ** 0.7) * 256)
+        vol_fp = _VEL_FP[velocity if 0 <= velocity < 128 else 100]
         self._lock.acquire()
         self._pending_on.append((midi_note, vol_fp))
         self._lock.release()
@@ -462,11 +484,25 @@ class MixEngine:
         self._lock.release()
 
     def all_off(self):
-        """Stop all voices immediately."""
+        """Stop all voices (called from main thread).
+
+        While the audio thread runs, the stop is queued like note
+        commands, so only core 1 touches the voices and _note_to_voice.
+        Note commands queued before the call are dropped.
+        """
         self._lock.acquire()
+        self._pending_on.clear()
+        self._pending_off.clear()
+        self._pending_all_off = self._running
+        self._lock.release()
+        if not self._running:
+            self._stop_all()
+
+    def _stop_all(self):
+        """Stop every voice and forget which notes they held."""
         for v in self.voices:
             v.stop()
-        self._lock.release()
+        self._note_to_voice.clear()
 
     def _alloc_voice(self):
         """Allocate a mixer voice using round-robin."""
@@ -474,13 +510,6 @@ class MixEngine:
         self._next_voice = (self._next_voice + 1) % self.max_voices
         return voice
 
-    def _find_voice(self, midi_note):
-        """Find which voice is playing a given note, or -1."""
-        for i, v in enumerate(self.voices):
-            if v.midi_note == midi_note:
-                return i
-        return -1
-
     def _process_commands(self):
         """Process pending note commands from the main thread."""
         self._lock.acquire()
@@ -488,29 +517,44 @@ class MixEngine:
         off_cmds = list(self._pending_off)
         self._pending_on.clear()
         self._pending_off.clear()
+        all_off = self._pending_all_off
+        self._pending_all_off = False
         self._lock.release()
 
+        if all_off:
+            self._stop_all()
+
         for midi, vol_fp in on_cmds:
             path = self._path_cache.get(midi)
             if path is None:
                 continue
             # Stop if already playing
-            existing = self._find_voice(midi)
+            existing = self._note_to_voice.pop(midi, -1)
             if existing >= 0:
                 self.voices[existing].stop()
             # Allocate and start
             idx = self._alloc_voice()
-            self.voices[idx].stop()
-            self.voices[idx].start(path, vol_fp, midi)
+            voice = self.voices[idx]
+            if voice.midi_note is not None:
+                self._note_to_voice.pop(voice.midi_note, None)
+            voice.stop()
+            voice.start(path, vol_fp, midi)
+            if voice.active:
+                self._note_to_voice[midi] = idx
 
         for midi in off_cmds:
-            idx = self._find_voice(midi)
+            idx = self._note_to_voice.pop(midi, -1)
             if idx >= 0:
                 self.voices[idx].stop()
 
+    @micropython.native
     def _mix_one_chunk(self):
-        """Mix all active voices into output buffer and write to I2S."""
+        """Mix all active voices into output buffer and write to I2S.
+
+        Compiled to native code: the per-sample loops run for every chunk.
+        """
         mix = self._mix_buf
+        out = self._out_buf
 
         # Zero the mix buffer
         for i in range(CHUNK_SIZE):
@@ -543,13 +587,10 @@ class MixEngine:
                 s = 32767
             elif s < -32768:
                 s = -32768
-            mix[i] = s
-
-        # Pack int16 array to bytes for I2S
-        struct.pack_into("<{}h".format(CHUNK_SIZE), self._out_bytes, 0, *mix)
+            out[i] = s
 
         # Blocking write to I2S
-        self.i2s.write(self._out_bytes)
+        self.i2s.write(out)
 
     def _audio_loop(self):
         """Audio mixing loop — runs on core 1."""
@@ -582,22 +623,26 @@ class MixEngine:
 # ---------------------------------------------------------------------------
 
 def build_note_lookup(notes):
-    """Build lookup dicts for finding notes by name+octave, idx, or MIDI."""
-    by_name = {}
-    by_idx = {}
-    by_midi = {}
+    """Build one lookup dict keyed by name+octave, idx, and MIDI string.
+
+    An idx can equal a note name (central-ring "C4" vs note C4), so keys
+    are filled in reverse priority: name+octave wins over idx, idx over MIDI.
+    """
+    lookup = {}
+    for n in notes:
+        lookup[str(n["midi"])] = n
     for n in notes:
-        key = "{}{}".format(n["name"], n["octave"])
-        by_name[key] = n
-        by_idx[n.get("idx", "")] = n
-        by_midi[str(n["midi"])] = n
-    return by_name, by_idx, by_midi
+        idx = n.get("idx", "")
+        if idx:
+            lookup[idx] = n
+    for n in notes:
+        lookup["{}{}".format(n["name"], n["octave"])] = n
+    return lookup
 
 
-def find_note(note_id, by_name, by_idx, by_midi):
+def find_note(note_id, lookup):
     """Find a note by name+octave, idx, or MIDI number string."""
-    note_id = str(note_id)
-    return by_name.get(note_id) or by_idx.get(note_id) or by_midi.get(note_id)
+    return lookup.get(str(note_id))
 
 
 def parse_note_input(text):
@@ -673,10 +718,10 @@ class ButtonInput:
 
     def __init__(self, pin_map, notes):
         self.buttons = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        lookup = build_note_lookup(notes)
 
         for pin_name, note_id in pin_map.items():
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -690,14 +735,20 @@ class ButtonInput:
             except Exception as e:
                 print("WARNING: {} init failed: {}".format(pin_name, e))
 
+    @micropython.native
     def scan(self):
-        """Returns (pressed_notes, released_notes) lists."""
+        """Returns (pressed, released) lists.
+
+        pressed holds (note, velocity) tuples (fixed velocity 100),
+        released holds note dicts. Compiled to native code: the per-pin
+        loop runs every scan.
+        """
         pressed = []
         released = []
         for btn in self.buttons:
             is_pressed = not btn["pin"].value()
             if is_pressed and not btn["was_pressed"]:
-                pressed.append(btn["note"])
+                pressed.append((btn["note"], 100))
             elif not is_pressed and btn["was_pressed"]:
                 released.append(btn["note"])
             btn["was_pressed"] = is_pressed
@@ -719,7 +770,7 @@ class DirectInput:
     """
 
     def __init__(self, notes, pads_config, adc_config=None):
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        lookup = build_note_lookup(notes)
         self.adc = None
         if adc_config and adc_config.get("type") == "i2c":
             try:
@@ -739,7 +790,7 @@ class DirectInput:
             adc_ch = cfg.get("adc_channel")
             if not pin_name:
                 continue
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -756,24 +807,26 @@ class DirectInput:
             except Exception as e:
                 print("WARNING: {} init failed: {}".format(pin_name, e))
 
+    @micropython.native
     def scan(self):
-        """Returns (pressed_notes, released_notes) lists."""
+        """Returns (pressed, released) lists.
+
+        pressed holds (note, velocity) tuples; the shared note dicts are
+        never copied.
+        """
         pressed = []
         released = []
         for pad in self.pads:
             is_active = not pad["pin"].value()  # active low
             if is_active and not pad["was_active"]:
-                note = dict(pad["note"])
+                vel = 100
                 if pad["adc_channel"] is not None and self.adc:
                     try:
                         raw = self.adc.read_channel(pad["adc_channel"])
-                        note["velocity"] = max(1, min(127,
-                            int((raw / 65535.0) * 126) + 1))
+                        vel = max(1, min(127, int((raw / 65535.0) * 126) + 1))
                     except OSError:
-                        note["velocity"] = 100
-                else:
-                    note["velocity"] = 100
-                pressed.append(note)
+                        pass
+                pressed.append((pad["note"], vel))
             elif not is_active and pad["was_active"]:
                 released.append(pad["note"])
             pad["was_active"] = is_active
@@ -796,7 +849,7 @@ class MuxTouchInput:
 
     def __init__(self, pin_map, notes, mux_config, adc_config=None):
         self.pads = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        lookup = build_note_lookup(notes)
 
         # Set up ADC
         adc_type = adc_config.get("type", "native") if adc_config else "native"
@@ -831,7 +884,7 @@ class MuxTouchInput:
                 note_id = pad_cfg.get("note", "")
                 mux_ch = pad_cfg.get("mux_channel")
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -848,8 +901,9 @@ class MuxTouchInput:
                 print("WARNING: {} init failed: {}".format(pin_name, e))
 
     def _set_mux_channel(self, channel):
+        pins = self.select_pins
         for i in range(self.num_select):
-            self.select_pins[i].value(1 if (channel & (1 << i)) else 0)
+            pins[i].value((channel >> i) & 1)
 
     def _read_velocity(self, channel):
         if channel is None or self.num_select == 0:
@@ -866,6 +920,7 @@ class MuxTouchInput:
         velocity = int((raw / 65535.0) * 126) + 1
         return max(1, min(127, velocity))
 
+    @micropython.native
     def scan(self):
         pressed = []
         released = []
@@ -873,9 +928,7 @@ class MuxTouchInput:
             is_pressed = not pad["pin"].value()
             if is_pressed and not pad["was_pressed"]:
                 vel = self._read_velocity(pad["mux_channel"])
-                note_with_vel = dict(pad["note"])
-                note_with_vel["velocity"] = vel
-                pressed.append(note_with_vel)
+                pressed.append((pad["note"], vel))
             elif not is_pressed and pad["was_pressed"]:
                 released.append(pad["note"])
             pad["was_pressed"] = is_pressed
@@ -892,14 +945,18 @@ class MuxScanInput:
     No digital trigger pins needed. Threshold crossing on the analog
     reading triggers notes; magnitude gives velocity. Supports all 29 pads.
     ADC via ADS1115 I2C (required when I2S occupies the native ADC pins).
+
+    Scans on core 0 from the main loop; core 1 is taken by the
+    MixEngine audio loop (MicroPython allows only one extra thread).
     """
 
     def __init__(self, notes, mux_config, pads_config, adc_config=None):
         self.pads = []
-        by_name, by_idx, by_midi = build_note_lookup(notes)
+        lookup = build_note_lookup(notes)
 
         self.threshold = mux_config.get("threshold", 3000)
         self.settle_us = mux_config.get("settle_us", 100)
+        self._build_velocity_table()
 
         # Shared mux select pins
         self.select_pins = []
@@ -954,7 +1011,7 @@ class MuxScanInput:
             mux_id = pad_cfg.get("mux", "a").lower()
             channel = pad_cfg.get("channel", 0)
 
-            note_info = find_note(note_id, by_name, by_idx, by_midi)
+            note_info = find_note(note_id, lookup)
             if note_info is None:
                 print("WARNING: Note {} not in layout".format(note_id))
                 continue
@@ -973,8 +1030,9 @@ class MuxScanInput:
         ))
 
     def _set_channel(self, channel):
+        pins = self.select_pins
         for i in range(self.num_select):
-            self.select_pins[i].value(1 if (channel & (1 << i)) else 0)
+            pins[i].value((channel >> i) & 1)
 
     def _enable_mux(self, mux_id):
         if self.en_a:
@@ -988,23 +1046,39 @@ class MuxScanInput:
         time.sleep_us(self.settle_us)
 
         try:
-            if self.ads:
-                ch = self.adc_a_ch if mux_id == "a" else self.adc_b_ch
-                return self.ads.read_channel(ch)
+            ads = self.ads
+            if ads:
+                return ads.read_channel(
+                    self.adc_a_ch if mux_id == "a" else self.adc_b_ch)
             else:
                 adc = self.native_adc_a if mux_id == "a" else self.native_adc_b
                 return adc.read_u16() if adc else 0
         except OSError:
             return 0
 
-    def _raw_to_velocity(self, raw):
-        above = raw - self.threshold
+    def _build_velocity_table(self):
+        """Precompute velocity 1-127 for each top byte of a raw reading.
+
+        Scales threshold..65535 to 1..127. Call again if threshold changes.
+        """
+        table = bytearray(256)
         max_range = 65535 - self.threshold
-        if max_range <= 0:
-            return 100
-        velocity = int((above / max_range) * 126) + 1
-        return max(1, min(127, velocity))
+        for b in range(256):
+            above = (b << 8) - self.threshold
+            if max_range <= 0:
+                v = 100
+            elif above <= 0:
+                v = 1
+            else:
+                v = max(1, min(127, int((above / max_range) * 126) + 1))
+            table[b] = v
+        self._raw_to_vel = table
+
+    def _raw_to_velocity(self, raw):
+        """Map raw ADC value above threshold to velocity 1-127."""
+        return self._raw_to_vel[raw >> 8]
 
+    @micropython.native
     def scan(self):
         pressed = []
         released = []
@@ -1015,9 +1089,7 @@ class MuxScanInput:
 
             if is_active and not pad["was_active"]:
                 vel = self._raw_to_velocity(raw)
-                note_with_vel = dict(pad["note"])
-                note_with_vel["velocity"] = vel
-                pressed.append(note_with_vel)
+                pressed.append((pad["note"], vel))
             elif not is_active and pad["was_active"]:
                 released.append(pad["note"])
 
@@ -1225,7 +1297,7 @@ def main():
     play_startup_tune(engine, notes)
 
     # Build note lookup for stdin input
-    by_name, by_idx, by_midi = build_note_lookup(notes)
+    lookup = build_note_lookup(notes)
     stdin_reader = StdinReader()
 
     def handle_stdin(reader):
@@ -1237,8 +1309,8 @@ def main():
         if parsed:
             name, octave = parsed
             midi = note_to_midi(name, octave)
-            if midi is not None and str(midi) in by_midi:
-                note = by_midi[str(midi)]
+            note = lookup.get(str(midi)) if midi is not None else None
+            if note is not None:
                 display = "{}{}".format(note["name"], note["octave"])
                 print("  STDIN: {} (MIDI {}, {:.0f} Hz)".format(
                     display, midi, note["freq"]))
@@ -1301,22 +1373,41 @@ def main():
     if led:
         led.value(1)
 
-    # Main loop - scan inputs + stdin, play/stop notes
+    # Main loop - scan inputs + stdin, play/stop notes. Paced from a
+    # deadline so scan work comes out of the 20 ms rather than adding to it.
+    # Methods are bound to locals first: a local load is cheaper than an
+    # attribute lookup every pass.
+    scan = inputs.scan
+    note_on = engine.note_on
+    ticks_ms = time.ticks_ms
+    ticks_add = time.ticks_add
+    ticks_diff = time.ticks_diff
+    sleep_ms = time.sleep_ms
+
+    deadline = ticks_ms()
     while True:
-        pressed, released = inputs.scan()
+        pressed, released = scan()
 
-        for note in pressed:
-            name = "{}{}".format(note["name"], note["octave"])
-            vel = note.get("velocity", 100)
-            print("  ON:  {} ({:.0f} Hz, vel={})".format(name, note["freq"], vel))
-            engine.note_on(note["midi"], velocity=vel)
+        for note, vel in pressed:
+            note_on(note["midi"], vel)
 
-        for note in released:
-            name = "{}{}".format(note["name"], note["octave"])
-            print("  OFF: {}".format(name))
+        # Report the scan in one print once its notes are playing: each
+        # print is a separate USB serial write
+        if pressed or released:
+            lines = ["  ON:  {}{} ({:.0f} Hz, vel={})".format(
+                note["name"], note["octave"], note["freq"], vel)
+                for note, vel in pressed]
+            for note in released:
+                lines.append("  OFF: {}{}".format(note["name"], note["octave"]))
+            print("\n".join(lines))
 
         handle_stdin(stdin_reader)
-        time.sleep(0.02)  # 50 Hz scan rate
+        deadline = ticks_add(deadline, SCAN_INTERVAL_MS)
+        wait = ticks_diff(deadline, ticks_ms())
+        if wait > 0:
+            sleep_ms(wait)
+        else:
+            deadline = ticks_ms()  # overran: resync, don't burst
 
 
 main()
@@ -22,7 +22,6 @@ import time
 import machine
 import math
 import array
-import struct
 import sys
 import os
 import json
@@ -244,10 +243,9 @@ def test_i2s_audio():
 
     for name, freq in test_freqs:
         if freq == 0:
+            # array('h') is little-endian int16 on the RP2040: write as-is
             buf = array.array("h", [0] * 1000)
-            out = bytearray(len(buf) * 2)
-            struct.pack_into("<{}h".format(len(buf)), out, 0, *buf)
-            i2s.write(out)
+            i2s.write(buf)
             time.sleep(0.2)
             info("{}: OK (no sound expected)".format(name))
             continue
@@ -264,11 +262,8 @@ def test_i2s_audio():
                 env = (n_samples - i) / fade_samples
             buf[i] = int(math.sin(2.0 * math.pi * i / period) * 28000 * env)
 
-        out = bytearray(n_samples * 2)
-        struct.pack_into("<{}h".format(n_samples), out, 0, *buf)
-
         try:
-            i2s.write(out)
+            i2s.write(buf)
             passed("{}: playing".format(name))
             time.sleep(0.1)
         except Exception as e:
@@ -288,12 +283,15 @@ def test_i2s_audio():
                 env = i / fade_samples
             elif i > n_samples - fade_samples:
                 env = (n_samples - i) / fade_samples
-            s = int(math.sin(2.0 * math.pi * i / period) * 7000 * env)
-            mix_buf[i] = max(-32768, min(32767, mix_buf[i] + s))
-
-    out = bytearray(n_samples * 2)
-    struct.pack_into("<{}h".format(n_samples), out, 0, *mix_buf)
-    i2s.write(out)
+            s = mix_buf[i] + int(math.sin(2.0 * math.pi * i / period)
+                                 * 7000 * env)
+            if s > 32767:
+                s = 32767
+            elif s < -32768:
+                s = -32768
+            mix_buf[i] = s
+
+    i2s.write(mix_buf)
     passed("Chord playing (4 tones mixed)")
     time.sleep(0.3)
 
@@ -303,7 +301,6 @@ def test_i2s_audio():
     sweep_samples = int(sample_rate * sweep_duration)
     chunk_size = 2048
     sweep_buf = array.array("h", [0] * chunk_size)
-    sweep_out = bytearray(chunk_size * 2)
     freq_start = 200
     freq_end = 2000
 
@@ -315,8 +312,7 @@ def test_i2s_audio():
             frac = t / sweep_duration
             freq = freq_start + (freq_end - freq_start) * frac
             sweep_buf[i] = int(math.sin(2.0 * math.pi * freq * t) * 24000)
-        struct.pack_into("<{}h".format(chunk_size), sweep_out, 0, *sweep_buf)
-        i2s.write(sweep_out)
+        i2s.write(sweep_buf)
 
     passed("Sweep complete")
 
@@ -716,9 +712,11 @@ def _play_wav_stream(i2s, path, max_seconds=0, pan=0.5):
     f = open(path, "rb")
     f.read(data_offset)  # skip header
 
+    # int16 arrays match the little-endian PCM layout, so file data is
+    # read straight into them with no per-sample byte assembly
     chunk_samples = 512
-    read_buf = bytearray(chunk_samples * 2)  # mono: 2 bytes per sample
-    out_buf = bytearray(chunk_samples * 4)   # stereo: 4 bytes per frame
+    read_buf = array.array("h", [0] * chunk_samples)  # mono samples
+    out_buf = array.array("h", [0] * chunk_samples * 2)  # stereo L/R frames
     total_read = 0
     if max_seconds > 0:
         max_bytes = int(max_seconds * sample_rate * (bits // 8) * channels)
@@ -728,24 +726,17 @@ def _play_wav_stream(i2s, path, max_seconds=0, pan=0.5):
     right_vol = int(pan * 256)
 
     while total_read < data_len:
-        to_read = min(len(read_buf), data_len - total_read)
+        to_read = min(chunk_samples * 2, data_len - total_read)
         n = f.readinto(read_buf, to_read)
         if n is None or n == 0:
             break
         total_read += n
         n_samp = n // 2
         for i in range(n_samp):
-            s = read_buf[i * 2] | (read_buf[i * 2 + 1] << 8)
-            if s >= 0x8000:
-                s -= 0x10000
-            l = (s * left_vol) >> 8
-            r = (s * right_vol) >> 8
-            j = i * 4
-            out_buf[j] = l & 0xFF
-            out_buf[j + 1] = (l >> 8) & 0xFF
-            out_buf[j + 2] = r & 0xFF
-            out_buf[j + 3] = (r >> 8) & 0xFF
-        i2s.write(out_buf[:n_samp * 4])
+            s = read_buf[i]
+            out_buf[2 * i] = (s * left_vol) >> 8
+            out_buf[2 * i + 1] = (s * right_vol) >> 8
+        i2s.write(memoryview(out_buf)[:n_samp * 2])
 
     f.close()
     return True
@@ -791,8 +782,8 @@ def _mix_wav_files(i2s, paths, max_seconds=2, stagger_ms=80, pan_map=None):
     n_voices = len(voices)
     mix_buf_l = array.array("h", [0] * chunk_samples)
     mix_buf_r = array.array("h", [0] * chunk_samples)
-    read_buf = bytearray(chunk_bytes)
-    out_buf = bytearray(chunk_samples * 4)  # stereo output
+    read_buf = array.array("h", [0] * chunk_samples)
+    out_buf = array.array("h", [0] * chunk_samples * 2)  # stereo L/R frames
 
     while True:
         # Clear mix buffers
@@ -820,10 +811,7 @@ def _mix_wav_files(i2s, paths, max_seconds=2, stagger_ms=80, pan_map=None):
             lv = v["lv"]
             rv = v["rv"]
             for i in range(n_samp):
-                s = read_buf[i * 2] | (read_buf[i * 2 + 1] << 8)
-                if s >= 0x8000:
-                    s -= 0x10000
-                s_scaled = s // n_voices
+                s_scaled = read_buf[i] // n_voices
                 val_l = mix_buf_l[i] + ((s_scaled * lv) >> 8)
                 if val_l > 32767:
                     val_l = 32767
@@ -842,13 +830,8 @@ def _mix_wav_files(i2s, paths, max_seconds=2, stagger_ms=80, pan_map=None):
 
         # Interleave L/R into stereo output
         for i in range(chunk_samples):
-            l = mix_buf_l[i]
-            r = mix_buf_r[i]
-            j = i * 4
-            out_buf[j] = l & 0xFF
-            out_buf[j + 1] = (l >> 8) & 0xFF
-            out_buf[j + 2] = r & 0xFF
-            out_buf[j + 3] = (r >> 8) & 0xFF
+            out_buf[2 * i] = mix_buf_l[i]
+            out_buf[2 * i + 1] = mix_buf_r[i]
         i2s.write(out_buf)
 
     for v in voices: